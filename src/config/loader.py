@@ -0,0 +1,98 @@
+import json
+import os
+from functools import lru_cache
+from typing import Dict, Tuple
+
+# Parsed configurations keyed by path, tagged with the file's mtime
+_config_cache: Dict[str, Tuple[int, Dict]] = {}
+
+
+class ConfigError(ValueError):
+    """A configuration file is not valid YAML."""
+
+
+@lru_cache(maxsize=None)
+def _safe_loader():
+    """Return libyaml's C loader when PyYAML was built with it, resolved once."""
+    # yaml itself stays a lazy import, a warm JSON cache never needs it
+    import yaml
+
+    return getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def _sidecar_path(config_path: str) -> str:
+    """Return the JSON cache file kept next to a YAML configuration."""
+    directory, filename = os.path.split(config_path)
+    return os.path.join(directory, ".cache", f"{os.path.splitext(filename)[0]}.json")
+
+
+def _read_sidecar(sidecar_path: str, mtime: int):
+    try:
+        with open(sidecar_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if cached.get("mtime") != mtime:
+        return None
+    return cached.get("config")
+
+
+def _string_keys(value) -> bool:
+    """Whether every mapping in a parsed YAML value has string keys only."""
+    if isinstance(value, dict):
+        return all(isinstance(k, str) and _string_keys(v) for k, v in value.items())
+    if isinstance(value, list):
+        return all(_string_keys(item) for item in value)
+    return True
+
+
+def _write_sidecar(sidecar_path: str, mtime: int, config: Dict) -> None:
+    # JSON would turn other keys into strings and the cached config would differ
+    if not _string_keys(config):
+        return
+    # The cache is only an optimization, a read-only config directory is fine
+    tmp_path = f"{sidecar_path}.{os.getpid()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(sidecar_path), exist_ok=True)
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"mtime": mtime, "config": config}, f)
+        os.replace(tmp_path, sidecar_path)
+    except (OSError, TypeError, ValueError):
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def load_config(config_path: str) -> Dict:
+    """
+    Load an object permission configuration from a YAML file.
+
+    The parsed configuration is cached for the lifetime of the process and
+    reused for as long as the file's modification time does not change.
+    Between runs it is kept as JSON in a .cache directory next to the file,
+    so the YAML is only parsed again after it has been modified.
+
+    Raises:
+        ConfigError: If the file is not valid YAML
+    """
+    mtime = os.stat(config_path).st_mtime_ns
+    cached = _config_cache.get(config_path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    sidecar_path = _sidecar_path(config_path)
+    config = _read_sidecar(sidecar_path, mtime)
+    if config is None:
+        import yaml
+
+        try:
+            with open(config_path, "r", encoding="utf-8") as f:
+                config = yaml.load(f, Loader=_safe_loader())
+        except yaml.YAMLError as e:
+            # Raised as our own error so callers need not import yaml to catch it
+            raise ConfigError(f"Invalid YAML in {config_path}: {str(e)}") from e
+        _write_sidecar(sidecar_path, mtime, config)
+
+    _config_cache[config_path] = (mtime, config)
+    return config
@@ -0,0 +1,68 @@
+import os
+from typing import Dict, List
+
+# System fields that cannot carry field-level security
+STANDARD_RESTRICTED_FIELDS = [
+    "Id",
+    "IsDeleted",
+    "CreatedById",
+    "CreatedDate",
+    "LastModifiedById",
+    "LastModifiedDate",
+    "SystemModstamp",
+    "LastViewedDate",
+    "LastReferencedDate",
+]
+
+
+def create_config_template(
+    object_name: str, record_types: List[Dict], fields: List[Dict], config_dir: str = "config"
+) -> str:
+    """
+    Write a configuration template for a Salesforce object.
+
+    Args:
+        object_name (str): Name of the Salesforce object
+        record_types (List[Dict]): Active record types of the object
+        fields (List[Dict]): Fields of the object with 'name' and 'updateable' keys
+        config_dir (str, optional): Target directory. Defaults to 'config'.
+
+    Returns:
+        str: Path of the created template
+    """
+    standard_restricted = STANDARD_RESTRICTED_FIELDS
+    restricted_set = frozenset(standard_restricted)
+    read_fields, edit_fields = [], []
+    for field in fields:
+        name = field["name"]
+        if name in restricted_set:
+            continue
+        read_fields.append(name)
+        if field.get("updateable"):
+            edit_fields.append(name)
+
+    template = {
+        "record_types": [rt["DeveloperName"] for rt in record_types] or ["Master"],
+        "fields": {"read": read_fields, "edit": edit_fields},
+        "restricted_fields": standard_restricted,
+    }
+
+    import yaml
+
+    # libyaml's C emitter when PyYAML was built with it
+    dumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+    os.makedirs(config_dir, exist_ok=True)
+    config_path = os.path.join(config_dir, f"{object_name}.yaml")
+    # With an encoding set the emitter writes UTF-8 bytes straight to the file
+    with open(config_path, "wb") as f:
+        f.write(f"# Configuration for {object_name} object permissions\n".encode("utf-8"))
+        yaml.dump(
+            template,
+            f,
+            Dumper=dumper,
+            sort_keys=False,
+            default_flow_style=False,
+            encoding="utf-8",
+        )
+
+    return config_path
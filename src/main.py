@@ -1,62 +1,373 @@
-import argparse
+import gzip
+import json
 import logging
 import os
 import sys
-from typing import Dict, List, Optional, Tuple
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.utils import formatdate
+from functools import lru_cache, partial
+from typing import Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote
 
-import yaml
 from elem6_logger import Elem6Logger
-from simple_salesforce.exceptions import SalesforceError
 
-from .config.loader import load_config
+from .config.loader import ConfigError, load_config
 from .config.templates import create_config_template
-from .salesforce_manager import sfdc_manager
+
+# yaml, argparse and the simple_salesforce import chain (requests, zeep, lxml)
+# are imported where they are used, so `--help` and argument errors return
+# without paying for them.
 
 logger = Elem6Logger.get_logger(__name__)
 
+# Maximum number of subrequests accepted by the composite/batch endpoint
+COMPOSITE_BATCH_SIZE = 25
+
+# Seconds If-Modified-Since is moved back from the local time a describe was
+# fetched; a local clock ahead of Salesforce's would otherwise get a 304 for a
+# describe that changed shortly before the fetch
+IF_MODIFIED_SINCE_MARGIN = 300
+
+# Object names per record type IN query, keeps the GET query URL short
+RECORD_TYPES_QUERY_CHUNK = 100
+
+# Permission set names per IN query, keeps the statement well below the SOQL length limit
+PERMISSION_SET_QUERY_CHUNK = 500
+
+# SOQL statements, values are quoted in by simple_salesforce.format_soql
+PERMISSION_SET_COUNT_QUERY = "SELECT COUNT() FROM PermissionSet WHERE Name = {}"
+PERMISSION_SETS_IN_QUERY = "SELECT Id, Name FROM PermissionSet WHERE Name IN {}"
+RECORD_TYPES_QUERY = (
+    "SELECT Id, Name, DeveloperName, IsActive FROM RecordType "
+    "WHERE SobjectType = {} AND IsActive = true"
+)
+FIELDS_QUERY = (
+    "SELECT QualifiedApiName, IsUpdatable FROM EntityParticle "
+    "WHERE EntityDefinition.QualifiedApiName = {}"
+)
+RECORD_TYPES_IN_QUERY = (
+    "SELECT Id, Name, DeveloperName, IsActive, SobjectType FROM RecordType "
+    "WHERE SobjectType IN {} AND IsActive = true"
+)
+
+# Number of objects processed in parallel unless PRAVATOR_WORKERS says otherwise
+DEFAULT_WORKERS = 8
+
+# Global describe payloads keyed by the connection that fetched them. Weak keys
+# let entries disappear together with the connection instead of being matched
+# by a recycled id().
+_global_describe_cache = weakref.WeakKeyDictionary()
+
+# Object names projected from the global describe: connection -> (all, custom)
+_object_names_cache = weakref.WeakKeyDictionary()
+
+# Per-object describe payloads: connection -> {object_name: describe}
+_sobject_describe_cache = weakref.WeakKeyDictionary()
+
+# When each cached describe was fetched or last confirmed unchanged:
+# connection -> {object_name: timestamp}
+_describe_validated_at = weakref.WeakKeyDictionary()
+
+# Describes saved by a previous run, revalidated with If-Modified-Since before
+# use: connection -> {object_name: (timestamp, describe)}
+_stored_describes = weakref.WeakKeyDictionary()
+
+# Guards the describe caches above, objects are processed from several threads
+_describe_lock = threading.Lock()
+
+
+def _cached_describe(connection) -> Dict:
+    """Return the global describe for a connection, fetching it only once."""
+    describe = _global_describe_cache.get(connection)
+    if describe is None:
+        # Held during the request so concurrent callers wait for a single describe
+        with _describe_lock:
+            describe = _global_describe_cache.get(connection)
+            if describe is None:
+                describe = connection.describe()
+                _global_describe_cache[connection] = describe
+    return describe
+
+
+def _object_names(connection) -> Tuple[List[str], List[str]]:
+    """Return the names of all objects and of custom objects, projected once per connection."""
+    names = _object_names_cache.get(connection)
+    if names is None:
+        all_objects, custom_objects = [], []
+        for sobject in _cached_describe(connection)["sobjects"]:
+            all_objects.append(sobject["name"])
+            if sobject.get("custom"):
+                custom_objects.append(sobject["name"])
+        names = _object_names_cache[connection] = (all_objects, custom_objects)
+    return names
+
+
+def _cached_sobject_describe(connection, object_name: str) -> Dict:
+    """Return the describe of a single object, fetching it once per connection."""
+    with _describe_lock:
+        describes = _sobject_describe_cache.setdefault(connection, {})
+        describe = describes.get(object_name)
+    if describe is None:
+        validated_at = time.time()
+        describe = getattr(connection, object_name).describe()
+        with _describe_lock:
+            describes[object_name] = describe
+            _describe_validated_at.setdefault(connection, {})[object_name] = validated_at
+    return describe
+
+
+def _describe_cache_path(connection) -> str:
+    cache_dir = os.path.expanduser(os.getenv("PRAVATOR_CACHE_DIR") or "~/.cache/pravator")
+    return os.path.join(
+        cache_dir, f"describes-{connection.sf_instance}-{connection.sf_version}.json.gz"
+    )
+
+
+def load_describe_cache(connection) -> None:
+    """Make the describes saved by a previous run available to batch_describe."""
+    path = _describe_cache_path(connection)
+    if not os.path.exists(path):
+        return
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            _stored_describes[connection] = json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable describe cache {path}: {str(e)}")
+
+
+def save_describe_cache(connection) -> None:
+    """Save the describes fetched or revalidated by this run for the next one."""
+    validated_at = _describe_validated_at.get(connection)
+    if not validated_at:
+        return
+
+    describes = _sobject_describe_cache[connection]
+    stored = dict(_stored_describes.get(connection, {}))
+    stored.update({name: (ts, describes[name]) for name, ts in validated_at.items()})
 
-def check_permission_set_exists(permission_set_name: str) -> bool:
+    path = _describe_cache_path(connection)
     try:
-        with sfdc_manager.connect() as connection:
-            result = connection.query(
-                f"SELECT Id FROM PermissionSet WHERE Name = '{permission_set_name}'"
-            )
-            return bool(result["totalSize"])
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with gzip.open(f"{path}.tmp", "wt", encoding="utf-8") as f:
+            json.dump(stored, f)
+        os.replace(f"{path}.tmp", path)
+    except OSError as e:
+        logger.warning(f"Could not save describe cache {path}: {str(e)}")
+
+
+def batch_describe(connection, object_names: List[str]) -> Dict[str, Dict]:
+    """
+    Describe several objects with composite/batch requests and cache the results.
+
+    Objects already in the describe cache are skipped. Describes saved by a
+    previous run are requested with If-Modified-Since and reused when Salesforce
+    answers 304. Objects whose subrequest failed are left out and will be
+    described individually on first use.
+
+    Args:
+        connection: Active Salesforce connection
+        object_names (List[str]): Names of the Salesforce objects
+
+    Returns:
+        Dict[str, Dict]: Describe payloads keyed by object name
+    """
+    with _describe_lock:
+        describes = _sobject_describe_cache.setdefault(connection, {})
+        validated_at = _describe_validated_at.setdefault(connection, {})
+        stored = _stored_describes.get(connection, {})
+    missing = [name for name in dict.fromkeys(object_names) if name not in describes]
+
+    for start in range(0, len(missing), COMPOSITE_BATCH_SIZE):
+        names = missing[start : start + COMPOSITE_BATCH_SIZE]
+        batch_requests = []
+        for name in names:
+            request = {"method": "GET", "url": f"v{connection.sf_version}/sobjects/{name}/describe"}
+            if name in stored:
+                since = formatdate(stored[name][0] - IF_MODIFIED_SINCE_MARGIN, usegmt=True)
+                request["httpHeaders"] = {"If-Modified-Since": since}
+            batch_requests.append(request)
+
+        requested_at = time.time()
+        response = connection.restful(
+            "composite/batch", method="POST", json={"batchRequests": batch_requests}
+        )
+        for name, result in zip(names, response["results"]):
+            if result["statusCode"] == 200:
+                describes[name] = result["result"]
+                validated_at[name] = requested_at
+            elif result["statusCode"] == 304 and name in stored:
+                describes[name] = stored[name][1]
+                validated_at[name] = requested_at
+            else:
+                logger.warning("Batch describe of %s failed: %s", name, result["result"])
+
+    return {name: describes[name] for name in object_names if name in describes}
+
+
+def check_permission_set_exists(connection, permission_set_name: str) -> bool:
+    from simple_salesforce import format_soql
+
+    try:
+        result = connection.query(format_soql(PERMISSION_SET_COUNT_QUERY, permission_set_name))
+        return bool(result["totalSize"])
     except Exception as e:
         logger.error(f"Error checking permission set existence: {str(e)}")
         return False
 
 
-def get_record_types(object_name: str) -> List[Dict]:
+def get_existing_permission_sets(connection, permission_set_names: List[str]) -> Dict[str, str]:
+    """
+    Look up which of the given permission sets already exist.
+
+    Args:
+        connection: Active Salesforce connection
+        permission_set_names (List[str]): Names of the permission sets
+
+    Returns:
+        Dict[str, str]: IDs of the existing permission sets keyed by name
+    """
+    from simple_salesforce import format_soql
+
+    existing: Dict[str, str] = {}
+    try:
+        for start in range(0, len(permission_set_names), PERMISSION_SET_QUERY_CHUNK):
+            chunk = permission_set_names[start : start + PERMISSION_SET_QUERY_CHUNK]
+            result = connection.query_all(format_soql(PERMISSION_SETS_IN_QUERY, chunk))
+            for record in result["records"]:
+                existing[record["Name"]] = record["Id"]
+    except Exception as e:
+        logger.error(f"Error checking permission set existence: {str(e)}")
+    return existing
+
+
+def get_record_types(connection, object_name: str) -> Iterator[Dict]:
+    """
+    Yield the active record types of an object.
+
+    Result pages beyond the first are fetched with queryMore while iterating,
+    so nothing past the first 2000 records is lost and no page is held longer
+    than needed. Errors are logged and end the iteration.
+    """
+    from simple_salesforce import format_soql
+
     try:
-        with sfdc_manager.connect() as connection:
-            query = f"""
-                SELECT Id, Name, DeveloperName, IsActive
-                FROM RecordType
-                WHERE SobjectType = '{object_name}'
-                AND IsActive = true
-            """
-            result = connection.query(query)
-            return result["records"]
+        result = connection.query(format_soql(RECORD_TYPES_QUERY, object_name))
+        yield from result["records"]
+        while not result["done"]:
+            result = connection.query_more(result["nextRecordsUrl"], identifier_is_url=True)
+            yield from result["records"]
     except Exception as e:
         logger.error(f"Error getting record types: {str(e)}")
-        return []
 
 
-def create_object_config_template(object_name: str) -> None:
+def get_record_types_by_object(connection, object_names: List[str]) -> Dict[str, List[Dict]]:
+    """
+    Get active record types of several objects with a single request.
+
+    Objects are queried with IN clauses of up to 100 names. When more than one
+    query is needed they are sent together as composite/batch subrequests, up
+    to 25 per call, and further result pages are fetched with queryMore.
+
+    Args:
+        connection: Active Salesforce connection
+        object_names (List[str]): Names of the Salesforce objects
+
+    Returns:
+        Dict[str, List[Dict]]: Record types keyed by object name, objects
+        without record types are missing
+    """
+    from simple_salesforce import format_soql
+
+    names = list(dict.fromkeys(object_names))
+    queries = [
+        format_soql(RECORD_TYPES_IN_QUERY, names[start : start + RECORD_TYPES_QUERY_CHUNK])
+        for start in range(0, len(names), RECORD_TYPES_QUERY_CHUNK)
+    ]
+
+    record_types: Dict[str, List[Dict]] = {}
     try:
-        logger.info(f"Creating configuration template for {object_name}")
+        if len(queries) == 1:
+            pages = [connection.query_all(queries[0])]
+        else:
+            pages = []
+            for start in range(0, len(queries), COMPOSITE_BATCH_SIZE):
+                batch_requests = [
+                    {"method": "GET", "url": f"v{connection.sf_version}/query?q={quote(query)}"}
+                    for query in queries[start : start + COMPOSITE_BATCH_SIZE]
+                ]
+                response = connection.restful(
+                    "composite/batch", method="POST", json={"batchRequests": batch_requests}
+                )
+                for result in response["results"]:
+                    if result["statusCode"] != 200:
+                        raise Exception(result["result"])
+                    page = result["result"]
+                    pages.append(page)
+                    while not page["done"]:
+                        page = connection.query_more(page["nextRecordsUrl"], identifier_is_url=True)
+                        pages.append(page)
+
+        for page in pages:
+            for record in page["records"]:
+                record_types.setdefault(record["SobjectType"], []).append(record)
+    except Exception as e:
+        logger.error(f"Error getting record types: {str(e)}")
+    return record_types
+
 
-        record_types = get_record_types(object_name)
+def get_fields(connection, object_name: str) -> List[Dict]:
+    """
+    Get the name and editability of every field of an object.
+
+    EntityParticle returns only the requested columns, a fraction of the
+    sobject describe which also carries picklist values and relationships.
+
+    Args:
+        connection: Active Salesforce connection
+        object_name (str): Name of the Salesforce object
+
+    Returns:
+        List[Dict]: Fields with 'name' and 'updateable' keys
+    """
+    from simple_salesforce import format_soql
+
+    result = connection.query_all(format_soql(FIELDS_QUERY, object_name))
+    return [
+        {"name": record["QualifiedApiName"], "updateable": record["IsUpdatable"]}
+        for record in result["records"]
+    ]
+
+
+def create_object_config_template(
+    connection, object_name: str, record_types: Optional[List[Dict]] = None
+) -> None:
+    """
+    Create a configuration template for an object.
+
+    Args:
+        connection: Active Salesforce connection
+        object_name (str): Name of the Salesforce object
+        record_types (Optional[List[Dict]]): Record types fetched by the caller,
+            queried here when not given
+    """
+    try:
+        logger.info("Creating configuration template for %s", object_name)
+
+        if record_types is None:
+            record_types = list(get_record_types(connection, object_name))
         if record_types:
-            logger.info(f"Found record types for {object_name}:")
+            logger.info("Found record types for %s:", object_name)
             for rt in record_types:
-                logger.info(f"  {rt['DeveloperName']}")
+                logger.info("  %s", rt["DeveloperName"])
         else:
-            logger.info(f"No record types found for {object_name}, using 'Master'")
+            logger.info("No record types found for %s, using 'Master'", object_name)
 
-        config_path = create_config_template(object_name, record_types)
-        logger.info(f"Configuration template created at {config_path}")
+        fields = get_fields(connection, object_name)
+        config_path = create_config_template(object_name, record_types, fields)
+        logger.info("Configuration template created at %s", config_path)
 
     except Exception as e:
         logger.error(f"Error creating configuration template: {str(e)}")
@@ -65,184 +376,322 @@ def create_object_config_template(object_name: str) -> None:
 def load_object_config(object_name: str) -> Dict:
     config_path = os.path.join("config", f"{object_name}.yaml")
     try:
-        logger.info(f"Loading configuration from {config_path}")
+        logger.info("Loading configuration from %s", config_path)
         if not os.path.exists(config_path):
             logger.error(f"Configuration file {config_path} not found")
             raise FileNotFoundError(f"Configuration file not found: {config_path}")
 
         config = load_config(config_path)
-        logger.debug(f"Configuration successfully loaded: {config}")
+        logger.debug("Configuration successfully loaded: %s", config)
         return config
-    except yaml.YAMLError as e:
+    except ConfigError as e:
         logger.error(f"Error loading YAML file: {str(e)}")
         raise
 
 
-def get_all_objects() -> List[str]:
+def get_all_objects(connection) -> List[str]:
     try:
         logger.info("Getting list of all objects")
-        with sfdc_manager.connect() as connection:
-            describe = connection.describe()
-            objects = [obj["name"] for obj in describe["sobjects"]]
-            logger.info(f"Found {len(objects)} objects")
-            return objects
+        objects = list(_object_names(connection)[0])
+        logger.info("Found %s objects", len(objects))
+        return objects
     except Exception as e:
         logger.error(f"Error getting list of objects: {str(e)}")
         raise
 
 
-def get_custom_objects() -> List[str]:
+def get_custom_objects(connection) -> List[str]:
     try:
         logger.info("Getting list of custom objects")
-        with sfdc_manager.connect() as connection:
-            describe = connection.describe()
-            objects = [obj["name"] for obj in describe["sobjects"] if obj["custom"]]
-            logger.info(f"Found {len(objects)} custom objects")
-            return objects
+        objects = list(_object_names(connection)[1])
+        logger.info("Found %s custom objects", len(objects))
+        return objects
     except Exception as e:
         logger.error(f"Error getting list of custom objects: {str(e)}")
         raise
 
 
-def setup_permissions(connection, object_name: str, config: Dict) -> None:
-    """Setup permissions for a Salesforce object based on configuration."""
-    try:
-        # Create read permission set
-        read_permission_set = connection.PermissionSet.create(
-            {"Name": f"{object_name}_read_Permissions", "Label": f"{object_name} Read Permissions"}
-        )
+def _permission_set_names(object_name: str) -> Tuple[str, str]:
+    """Return the names of the read and edit permission sets of an object."""
+    return f"{object_name}_read_Permissions", f"{object_name}_edit_Permissions"
 
-        # Create edit permission set
-        edit_permission_set = connection.PermissionSet.create(
-            {"Name": f"{object_name}_edit_Permissions", "Label": f"{object_name} Edit Permissions"}
-        )
 
-        # Set field permissions
-        for field in config.get("fields", {}).get("read", []):
-            connection.FieldPermissions.create(
-                {
-                    "ParentId": read_permission_set["id"],
-                    "SobjectType": object_name,
-                    "Field": f"{object_name}.{field}",
-                    "PermissionsRead": True,
-                    "PermissionsEdit": False,
-                }
-            )
+def _permission_set_records(object_name: str) -> List[Dict[str, str]]:
+    """Return the Name and Label of the read and edit permission sets of an object."""
+    read_name, edit_name = _permission_set_names(object_name)
+    return [
+        {"Name": read_name, "Label": f"{object_name} Read Permissions"},
+        {"Name": edit_name, "Label": f"{object_name} Edit Permissions"},
+    ]
+
+
+def create_missing_permission_sets(
+    objects: List[str], existing_permission_sets: Dict[str, str]
+) -> Dict[str, str]:
+    """
+    Create the read and edit permission sets the objects are still missing.
+
+    All of them are created together, so a run costs one request per 200
+    permission sets instead of two requests per object.
+
+    Returns:
+        Dict[str, str]: IDs of the created permission sets keyed by name
+    """
+    from .salesforce_manager import sfdc_manager
 
-        for field in config.get("fields", {}).get("edit", []):
-            connection.FieldPermissions.create(
-                {
-                    "ParentId": edit_permission_set["id"],
-                    "SobjectType": object_name,
-                    "Field": f"{object_name}.{field}",
-                    "PermissionsRead": True,
-                    "PermissionsEdit": True,
-                }
+    missing = [
+        record
+        for object_name in objects
+        for record in _permission_set_records(object_name)
+        if record["Name"] not in existing_permission_sets
+    ]
+    if not missing:
+        return {}
+    return sfdc_manager.create_permission_sets(missing)
+
+
+def setup_permissions(
+    object_name: str,
+    config: Dict,
+    existing_permission_sets: Optional[Dict[str, str]] = None,
+    created_permission_sets: Optional[Dict[str, str]] = None,
+) -> None:
+    """
+    Setup permissions for a Salesforce object based on configuration.
+
+    The read and edit permission sets are looked up by name in
+    existing_permission_sets and created_permission_sets (name -> ID). Fields
+    an existing permission set already grants are skipped and fields granted
+    with a different access are updated.
+    """
+    from .salesforce_manager import sfdc_manager
+
+    existing_permission_sets = existing_permission_sets or {}
+    permission_set_ids = {**(created_permission_sets or {}), **existing_permission_sets}
+    try:
+        fields = config.get("fields", {})
+        for name, access in zip(_permission_set_names(object_name), ("read", "edit")):
+            permission_set_id = permission_set_ids.get(name)
+            if permission_set_id is None:
+                raise Exception(f"Permission set {name} was not created")
+
+            # The read and edit lists go to different permission sets, so a field may
+            # be in both; within one list a repeated field would be a duplicate insert
+            sfdc_manager.set_field_permissions(
+                permission_set_id,
+                object_name,
+                list(dict.fromkeys(fields.get(access, []))),
+                access,
+                # Only reused permission sets can already have field permissions
+                check_existing=name in existing_permission_sets,
             )
 
     except Exception as e:
         raise Exception(f"Error setting up permissions: {str(e)}")
 
 
-def process_objects(
-    connection, objects: List[str], verbose: bool = False, create_template: bool = False
+def _process_one(
+    connection,
+    object_name: str,
+    verbose: bool,
+    create_template: bool,
+    record_types_by_object: Optional[Dict[str, List[Dict]]] = None,
+    existing_permission_sets: Optional[Dict[str, str]] = None,
+    created_permission_sets: Optional[Dict[str, str]] = None,
 ) -> None:
-    for object_name in objects:
-        try:
-            logger.info(f"Processing object {object_name}")
+    """Process a single Salesforce object, errors are left to the caller."""
+    logger.info("Processing object %s", object_name)
 
-            if create_template:
-                create_object_config_template(object_name)
-                continue
+    if create_template:
+        record_types = None
+        if record_types_by_object is not None:
+            record_types = record_types_by_object.get(object_name, [])
+        create_object_config_template(connection, object_name, record_types)
+        return
 
-            try:
-                config = load_object_config(object_name)
-            except FileNotFoundError:
-                logger.error(f"Configuration file not found for {object_name}")
-                continue
-
-            record_types = get_record_types(object_name)
-            if record_types:
-                logger.info(f"Found record types for {object_name}:")
-                for rt in record_types:
-                    logger.info(f"  {rt['DeveloperName']}")
-            else:
-                logger.info(f"No record types found for {object_name}, using 'Master'")
+    try:
+        config = load_object_config(object_name)
+    except FileNotFoundError:
+        logger.error(f"Configuration file not found for {object_name}")
+        return
+
+    # Record types are only reported here and are prefetched when INFO is enabled
+    if record_types_by_object is not None:
+        record_types = record_types_by_object.get(object_name, [])
+        if record_types:
+            logger.info("Found record types for %s:", object_name)
+            for rt in record_types:
+                logger.info("  %s", rt["DeveloperName"])
+        else:
+            logger.info("No record types found for %s, using 'Master'", object_name)
 
-            if verbose:
-                describe = connection.describe()
-                logger.info("Object details:")
-                logger.info(f"  Label: {describe['label']}")
-                logger.info(f"  API Name: {describe['name']}")
-                logger.info(f"  Custom: {describe['custom']}")
-                logger.info(f"  Number of fields: {len(describe['fields'])}")
-
-                allowed_fields = [
-                    f
-                    for f in describe["fields"]
-                    if f["name"] not in config.get("restricted_fields", [])
-                ]
-                logger.info(f"  Allowed fields: {len(allowed_fields)}")
-                logger.info(f"  Restricted fields: {len(config.get('restricted_fields', []))}")
+    if verbose:
+        describe = _cached_sobject_describe(connection, object_name)
+        logger.info("Object details:")
+        logger.info("  Label: %s", describe["label"])
+        logger.info("  API Name: %s", describe["name"])
+        logger.info("  Custom: %s", describe["custom"])
+        logger.info("  Number of fields: %s", len(describe["fields"]))
 
-            setup_permissions(connection, object_name, config)
-            logger.info(f"Object {object_name} successfully processed")
+        restricted_fields = frozenset(config.get("restricted_fields") or ())
+        allowed_fields = sum(f["name"] not in restricted_fields for f in describe["fields"])
+        logger.info("  Allowed fields: %s", allowed_fields)
+        logger.info("  Restricted fields: %s", len(restricted_fields))
 
-        except SalesforceError as e:
-            logger.error(f"Error processing object {object_name}: {str(e)}")
+    setup_permissions(object_name, config, existing_permission_sets, created_permission_sets)
+    logger.info("Object %s successfully processed", object_name)
 
 
-def main():
+def _configured_objects(objects: List[str]) -> List[str]:
+    """Return the objects that have a configuration file, logging the others."""
     try:
-        parser = argparse.ArgumentParser(
-            description="PRavator: Salesforce Permission Manager",
-            epilog="Example usage:\n"
-            "  Process all objects:           python main.py --all\n"
-            "  Process custom objects:        python main.py --custom-all\n"
-            "  Process specific objects:      python main.py --objects Account Contact\n"
-            "  Create config templates:       python main.py --objects Account --create-template\n"
-            "  Debug mode with verbose:       python main.py --objects Account --debug --verbose",
-            formatter_class=argparse.RawDescriptionHelpFormatter,
-        )
-        parser.add_argument(
-            "-a",
-            "--all",
-            action="store_true",
-            help="Process all Salesforce objects (standard and custom). This option will analyze and process permissions for every object in your org.",
-        )
-        parser.add_argument(
-            "-ca",
-            "--custom-all",
-            action="store_true",
-            help="Process all custom Salesforce objects only. This excludes standard objects and focuses only on custom objects in your org.",
-        )
-        parser.add_argument(
-            "-o",
-            "--objects",
-            nargs="+",
-            help="Specify one or more Salesforce objects to process. Example: --objects Account Contact Lead",
-        )
-        parser.add_argument(
-            "-v",
-            "--verbose",
-            action="count",
-            default=0,
-            help="Set verbosity level: -v for WARNING, -vv for ERROR, -vvv for CRITICAL. Each additional v increases the logging detail.",
-        )
-        parser.add_argument(
-            "-d",
-            "--debug",
-            action="store_true",
-            help="Enable debug mode with maximum logging detail. Useful for troubleshooting issues.",
-        )
-        parser.add_argument(
-            "-t",
-            "--create-template",
-            action="store_true",
-            help="Generate YAML configuration templates for specified objects. These templates can be customized for permission management.",
+        available = set(os.listdir("config"))
+    except FileNotFoundError:
+        available = set()
+
+    configured = []
+    for object_name in objects:
+        if f"{object_name}.yaml" in available:
+            configured.append(object_name)
+        else:
+            logger.error(f"Configuration file not found for {object_name}")
+    return configured
+
+
+def process_objects(
+    connection, objects: List[str], verbose: bool = False, create_template: bool = False
+) -> None:
+    """
+    Process Salesforce objects concurrently.
+
+    Objects are I/O bound and independent of each other, so they are handed to a
+    thread pool whose size is read from the PRAVATOR_WORKERS environment
+    variable (default 8). Objects without a configuration file are dropped
+    before any Salesforce request is made, unless templates are being created.
+
+    Raises:
+        Exception: If any of the objects failed, after all of them were processed
+    """
+    if not create_template:
+        objects = _configured_objects(objects)
+        if not objects:
+            return
+
+    # The object details are logged at INFO, -v alone raises the level above it
+    verbose = verbose and logger.isEnabledFor(logging.INFO)
+
+    max_workers = max(1, int(os.getenv("PRAVATOR_WORKERS", DEFAULT_WORKERS)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        # Describes are only needed for verbose output; fetch them in the
+        # background while the record types are queried
+        describes = None
+        if verbose:
+            describes = executor.submit(batch_describe, connection, objects)
+
+        # Templates need the record types; otherwise they are only logged, so
+        # skip the query when nobody would see it
+        record_types_by_object = None
+        if create_template or logger.isEnabledFor(logging.INFO):
+            record_types_by_object = get_record_types_by_object(connection, objects)
+
+        # One lookup for all permission sets instead of a query per object, and
+        # the missing ones are created together
+        existing_permission_sets = created_permission_sets = None
+        if not create_template:
+            names = [name for obj in objects for name in _permission_set_names(obj)]
+            existing_permission_sets = get_existing_permission_sets(connection, names)
+            created_permission_sets = create_missing_permission_sets(
+                objects, existing_permission_sets
+            )
+
+        if describes is not None:
+            try:
+                describes.result()
+            except Exception as e:
+                logger.warning(f"Batch describe failed, describing objects one by one: {str(e)}")
+
+        process = partial(
+            _process_one,
+            connection,
+            verbose=verbose,
+            create_template=create_template,
+            record_types_by_object=record_types_by_object,
+            existing_permission_sets=existing_permission_sets,
+            created_permission_sets=created_permission_sets,
         )
+        futures = {executor.submit(process, object_name): object_name for object_name in objects}
+        # A failing object is reported and must not stop the remaining ones
+        failed = []
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Error processing object {futures[future]}: {str(e)}")
+                failed.append(futures[future])
+
+    if failed:
+        raise Exception(f"Failed to process {len(failed)} objects: {', '.join(sorted(failed))}")
+
+
+@lru_cache(maxsize=None)
+def _build_parser():
+    """Build the command line parser once; argparse is only imported when needed."""
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="PRavator: Salesforce Permission Manager",
+        epilog="Example usage:\n"
+        "  Process all objects:           python main.py --all\n"
+        "  Process custom objects:        python main.py --custom-all\n"
+        "  Process specific objects:      python main.py --objects Account Contact\n"
+        "  Create config templates:       python main.py --objects Account --create-template\n"
+        "  Debug mode with verbose:       python main.py --objects Account --debug --verbose",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "-a",
+        "--all",
+        action="store_true",
+        help="Process all Salesforce objects (standard and custom). This option will analyze and process permissions for every object in your org.",
+    )
+    parser.add_argument(
+        "-ca",
+        "--custom-all",
+        action="store_true",
+        help="Process all custom Salesforce objects only. This excludes standard objects and focuses only on custom objects in your org.",
+    )
+    parser.add_argument(
+        "-o",
+        "--objects",
+        nargs="+",
+        help="Specify one or more Salesforce objects to process. Example: --objects Account Contact Lead",
+    )
+    parser.add_argument(
+        "-v",
+        "--verbose",
+        action="count",
+        default=0,
+        help="Set verbosity level: -v for WARNING, -vv for ERROR, -vvv for CRITICAL. Each additional v increases the logging detail.",
+    )
+    parser.add_argument(
+        "-d",
+        "--debug",
+        action="store_true",
+        help="Enable debug mode with maximum logging detail. Useful for troubleshooting issues.",
+    )
+    parser.add_argument(
+        "-t",
+        "--create-template",
+        action="store_true",
+        help="Generate YAML configuration templates for specified objects. These templates can be customized for permission management.",
+    )
+
+    return parser
 
-        args = parser.parse_args()
+
+def main():
+    try:
+        args = _build_parser().parse_args()
 
         # Set logging level based on arguments
         if args.debug:
@@ -256,27 +705,39 @@ def main():
         else:
             logger.setLevel(logging.INFO)
 
+        from .salesforce_manager import sfdc_manager
+
         try:
             with sfdc_manager.connect() as connection:
                 api_usage = sfdc_manager.get_api_usage()
                 if not isinstance(api_usage, tuple) or len(api_usage) != 2:
                     raise ValueError("Invalid API usage format")
                 remaining, max_requests = api_usage
-                logger.info(f"API Usage: {remaining}/{max_requests} requests remaining")
+                logger.info("API Usage: %s/%s requests remaining", remaining, max_requests)
 
                 if args.all:
-                    objects = get_all_objects()
+                    objects = get_all_objects(connection)
                 elif args.custom_all:
-                    objects = get_custom_objects()
+                    objects = get_custom_objects(connection)
                 elif args.objects:
-                    objects = args.objects
+                    # Names are matched against config file names, so only exact repeats go
+                    objects = list(dict.fromkeys(args.objects))
+                    if len(objects) < len(args.objects):
+                        logger.warning(
+                            "Ignoring %s duplicate objects", len(args.objects) - len(objects)
+                        )
                 else:
                     logger.error("No objects specified for processing")
                     sys.exit(1)
 
-                process_objects(
-                    connection, objects, args.verbose > 0 or args.debug, args.create_template
-                )
+                verbose = args.verbose > 0 or args.debug
+                # Only the verbose output uses object describes, and only at INFO
+                if verbose and logger.isEnabledFor(logging.INFO):
+                    load_describe_cache(connection)
+                try:
+                    process_objects(connection, objects, verbose, args.create_template)
+                finally:
+                    save_describe_cache(connection)
                 logger.info("Program successfully completed")
 
         except Exception as e:
@@ -1,14 +1,173 @@
+import csv
+import io
+import logging
 import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from itertools import groupby
-from operator import itemgetter
+from dataclasses import asdict, dataclass
+from functools import wraps
 from typing import Any, Dict, List, Optional, Tuple
 
+import requests
 from elem6_logger import Elem6Logger
-from simple_salesforce import Salesforce
+from requests.adapters import HTTPAdapter
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import ConnectTimeout
+from simple_salesforce import Salesforce, format_soql
+from simple_salesforce.exceptions import SalesforceError, SalesforceExpiredSession
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.retry import Retry
+
+try:
+    import orjson
+except ImportError:  # optional, responses are parsed with the stdlib json instead
+    orjson = None
 
 logger = Elem6Logger.get_logger(__name__)
 
+# Records per sObject Collections request
+COLLECTIONS_BATCH_SIZE = 200
+
+# Collection requests of one call in flight at the same time, stays well below
+# the org's limit on concurrent long-running requests
+CONCURRENT_REQUESTS = 5
+
+# Field count from which field permissions are loaded with a Bulk API 2.0 job,
+# overridable with PRAVATOR_BULK_THRESHOLD. A job costs a handful of calls and
+# some polling, so it only pays off once it replaces many collection requests.
+BULK_THRESHOLD = 2000
+
+EXISTING_FIELD_PERMISSIONS_QUERY = (
+    "SELECT Id, Field, PermissionsRead, PermissionsEdit FROM FieldPermissions "
+    "WHERE ParentId = {} AND SobjectType = {}"
+)
+
+# Whether an access level grants edit on top of read
+_ACCESS_EDIT = {"read": False, "edit": True}
+_VALID_ACCESS = frozenset(_ACCESS_EDIT)
+
+# Concurrent requests allowed per endpoint; PRAVATOR_MAX_CONCURRENT_REQUESTS
+# sets one limit for all of them
+ENDPOINT_CONCURRENCY = {"PermissionSet": 5, "FieldPermissions": 10}
+
+
+# Seconds a limits() response is trusted; requests sent through the manager in
+# the meantime are subtracted locally instead of asking Salesforce again
+LIMITS_TTL = 60.0
+
+# Seconds a connection is reused by connect() before logging in again
+SESSION_MAX_AGE = 3600.0
+
+# HTTP connections kept for the Salesforce host; requests wait for a free one
+# instead of opening connections that are discarded right after use
+HTTP_POOL_SIZE = 50
+
+
+class RetryableSalesforceError(Exception):
+    """A request failed for a transient reason and can be sent again."""
+
+
+def _retry(tries: int = 5, base: float = 0.3, factor: float = 2.0, jitter: float = 0.2):
+    """
+    Send a request again when it fails with RetryableSalesforceError.
+
+    GET and PATCH requests are already retried by the HTTP adapter. This covers
+    POSTs that Salesforce answered with 503 or that could not open a connection,
+    including the sObject Collections requests of _send_records that create the
+    permission sets and field permissions of a run.
+    A connection dropped after the request was sent is not retried, the create
+    may have succeeded and sending it again would fail as a duplicate.
+
+    Args:
+        tries (int): Attempts in total
+        base (float): Seconds to wait before the first retry
+        factor (float): Multiplier of the wait for every further retry
+        jitter (float): Random share of the wait, keeps parallel workers apart
+    """
+
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            for attempt in range(tries - 1):
+                try:
+                    return func(*args, **kwargs)
+                except RetryableSalesforceError as e:
+                    delay = base * factor**attempt * (1 + random.uniform(-jitter, jitter))
+                    logger.warning("%s, retrying in %.1f s", e, delay)
+                    time.sleep(delay)
+            return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+@dataclass(frozen=True)
+class SFSettings:
+    """Credentials of the Salesforce connection, read from the environment."""
+
+    username: str
+    password: str
+    security_token: str
+    instance: Optional[str] = None
+
+    @classmethod
+    def from_env(cls) -> "SFSettings":
+        """
+        Read the settings from SF_* environment variables.
+
+        Raises:
+            ValueError: If a required credential is not set
+        """
+        env = os.environ
+        settings = {
+            "username": env.get("SF_USERNAME"),
+            "password": env.get("SF_PASSWORD"),
+            "security_token": env.get("SF_SECURITY_TOKEN"),
+        }
+        missing = [f"SF_{name.upper()}" for name, value in settings.items() if not value]
+        if missing:
+            raise ValueError(f"Missing Salesforce settings: {', '.join(missing)}")
+        return cls(instance=env.get("SF_DOMAIN"), **settings)
+
+
+def _permission_set_fields(object_name: str, record_type: str) -> Dict[str, str]:
+    """Return the Name, Label and Description of an object's permission set."""
+    return {
+        "Name": f"{object_name}_{record_type}_Permissions",
+        "Label": f"{object_name} {record_type} Permissions",
+        "Description": f"Permission set for {object_name} with record type {record_type}",
+    }
+
+
+def _positive_int_env(name: str) -> Optional[int]:
+    """
+    Read an integer environment variable, at least 1 when set.
+
+    Raises:
+        ValueError: If the variable is not an integer
+    """
+    value = os.environ.get(name)
+    if not value:
+        return None
+    try:
+        return max(1, int(value))
+    except ValueError:
+        raise ValueError(f"{name} must be an integer, got {value!r}") from None
+
+
+def _request_not_sent(error: RequestsConnectionError) -> bool:
+    """Whether a connection error happened before the request reached Salesforce."""
+    if isinstance(error, ConnectTimeout):
+        return True
+    reason = error.args[0] if error.args else None
+    # requests wraps urllib3's MaxRetryError, whose reason is the original error
+    reason = getattr(reason, "reason", reason)
+    return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+
 
 class SalesforceManager:
     """
@@ -17,48 +176,169 @@ class SalesforceManager:
 
     def __init__(self):
         self.connection: Optional[Salesforce] = None
+        self._settings: Optional[SFSettings] = None
+        self._connected_at: Optional[float] = None
+        # (remaining, max, monotonic time of the limits() call)
+        self._limits_cache: Optional[Tuple[int, int, float]] = None
+        self._limits_lock = threading.Lock()
+        # Read from PRAVATOR_BULK_THRESHOLD by the first set_field_permissions()
+        self._bulk_threshold: Optional[int] = None
+        # Built on first use, the module-level instance must not read the
+        # environment at import time
+        self._limiters: Optional[Dict[str, threading.BoundedSemaphore]] = None
+        self._limiters_lock = threading.Lock()
+
+    def _get_limiters(self) -> Dict[str, threading.BoundedSemaphore]:
+        """
+        Return the per-endpoint semaphores, creating them on the first call.
+
+        Raises:
+            ValueError: If PRAVATOR_MAX_CONCURRENT_REQUESTS is not an integer
+        """
+        with self._limiters_lock:
+            if self._limiters is None:
+                max_concurrent = _positive_int_env("PRAVATOR_MAX_CONCURRENT_REQUESTS")
+                self._limiters = {
+                    endpoint: threading.BoundedSemaphore(max_concurrent or limit)
+                    for endpoint, limit in ENDPOINT_CONCURRENCY.items()
+                }
+            return self._limiters
+
+    @contextmanager
+    def _limited(self, endpoint: str):
+        """
+        Hold one of the endpoint's concurrency slots for the duration of a request.
+
+        Raises:
+            RetryableSalesforceError: If the request failed with 503 or was never sent
+        """
+        with self._get_limiters()[endpoint]:
+            try:
+                yield
+                self._count_api_request()
+            except RequestsConnectionError as e:
+                if _request_not_sent(e):
+                    raise RetryableSalesforceError(
+                        f"Connection to {endpoint} failed: {str(e)}"
+                    ) from e
+                raise
+            except SalesforceError as e:
+                if e.status == 503:
+                    raise RetryableSalesforceError(f"{endpoint} is unavailable: {str(e)}") from e
+                raise
+
+    def _count_api_request(self) -> None:
+        """Subtract a request sent by the manager from the cached API usage."""
+        with self._limits_lock:
+            if self._limits_cache is not None:
+                remaining, max_requests, fetched_at = self._limits_cache
+                self._limits_cache = (max(remaining - 1, 0), max_requests, fetched_at)
+
+    @staticmethod
+    def create_session() -> requests.Session:
+        """Create the HTTP session used by Salesforce connections."""
+        retry = Retry(
+            total=5,
+            backoff_factor=0.5,
+            status_forcelist=[429, 502, 503, 504],
+            # Creates are not idempotent, a POST is only resent if it never reached the server
+            allowed_methods=["GET", "PATCH"],
+        )
+        adapter = HTTPAdapter(pool_maxsize=HTTP_POOL_SIZE, pool_block=True, max_retries=retry)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        return session
 
     def create_connection(self) -> Salesforce:
         """Create a new Salesforce connection."""
-        return Salesforce(
-            username=os.getenv("SF_USERNAME"),
-            password=os.getenv("SF_PASSWORD"),
-            security_token=os.getenv("SF_SECURITY_TOKEN"),
-            instance=os.getenv("SF_DOMAIN"),
-        )
+        # Read and validated on the first connection, reused by reconnects
+        if self._settings is None:
+            self._settings = SFSettings.from_env()
+        connection = Salesforce(**asdict(self._settings), session=self.create_session())
+        if orjson is not None:
+            # Every REST response of the connection (describes, queries, composite
+            # calls) goes through this hook; orjson parses large payloads faster
+            connection.parse_result_to_json = lambda result: orjson.loads(result.content)
+        return connection
 
     @contextmanager
     def connect(self):
-        """Context manager for handling Salesforce connection."""
+        """
+        Context manager for handling Salesforce connection.
+
+        The connection is kept after the block ends and reused by the next
+        connect() for up to SESSION_MAX_AGE seconds, since Salesforce limits
+        how often a user may log in. It is dropped by close() or when the
+        session turns out to be expired.
+        """
+        # An invalid PRAVATOR_MAX_CONCURRENT_REQUESTS fails before logging in
+        self._get_limiters()
         try:
-            logger.info("Establishing Salesforce connection...")
-            self.connection = self.create_connection()
-            logger.info("Salesforce connection established successfully")
+            if not self._connection_valid():
+                self.close()
+                logger.info("Establishing Salesforce connection...")
+                self.connection = self.create_connection()
+                self._connected_at = time.monotonic()
+                logger.info("Salesforce connection established successfully")
             yield self.connection
+        except SalesforceExpiredSession:
+            logger.error("Salesforce session expired", exc_info=True)
+            self.close()
+            raise
         except Exception as e:
             logger.error("Failed to connect to Salesforce", exc_info=True)
             raise
-        finally:
-            self.connection = None
+
+    def _connection_valid(self) -> bool:
+        return (
+            self.connection is not None
+            and bool(getattr(self.connection, "session_id", None))
+            and time.monotonic() - self._connected_at < SESSION_MAX_AGE
+        )
+
+    def close(self) -> None:
+        """Drop the current connection together with everything cached for it."""
+        if self.connection is not None:
+            self.connection.session.close()
+        self.connection = None
+        self._connected_at = None
+        self._limits_cache = None
 
     def get_api_usage(self) -> Tuple[int, int]:
         """
         Získá aktuální využití API limitů ze Salesforce.
 
+        Výsledek limits() se používá po dobu LIMITS_TTL sekund a požadavky
+        odeslané mezitím přes manager se od něj odečítají lokálně.
+
         Returns:
             Tuple[int, int]: (použité limity, celkové limity)
         """
         if not self.connection:
             raise RuntimeError("No active Salesforce connection")
 
+        with self._limits_lock:
+            cached = self._limits_cache
+        if cached and time.monotonic() - cached[2] < LIMITS_TTL:
+            return cached[0], cached[1]
+
         try:
-            limits = self.connection.limits()
-            daily_api_requests = limits["DailyApiRequests"]
-            return daily_api_requests["Remaining"], daily_api_requests["Max"]
+            limits = self.connection.limits() or {}
         except Exception as e:
             logger.error(f"Failed to get API usage: {e}", exc_info=True)
-            raise Exception(f"Failed to get API usage: {str(e)}")
+            raise Exception(f"Failed to get API usage: {str(e)}") from e
 
+        daily_api_requests = limits.get("DailyApiRequests") or {}
+        try:
+            remaining, max_requests = daily_api_requests["Remaining"], daily_api_requests["Max"]
+        except KeyError:
+            raise RuntimeError(f"Unexpected limits response: {limits}") from None
+
+        with self._limits_lock:
+            self._limits_cache = (remaining, max_requests, time.monotonic())
+        return remaining, max_requests
+
+    @_retry()
     def create_permission_set(self, object_name: str, record_type: str) -> str:
         """
         Create a permission set for a given Salesforce object and record type.
@@ -77,19 +357,15 @@ class SalesforceManager:
             raise RuntimeError("No active Salesforce connection")
 
         try:
-            permission_set_name = f"{object_name}_{record_type}_Permissions"
-            logger.info(f"Creating permission set {permission_set_name}")
-
-            result = self.connection.PermissionSet.create(
-                {
-                    "Name": permission_set_name,
-                    "Label": f"{object_name} {record_type} Permissions",
-                    "Description": f"Permission set for {object_name} with record type {record_type}",
-                }
-            )
+            fields = _permission_set_fields(object_name, record_type)
+            permission_set_name = fields["Name"]
+            logger.info("Creating permission set %s", permission_set_name)
+
+            with self._limited("PermissionSet"):
+                result = self.connection.PermissionSet.create(fields)
 
             if result.get("success"):
-                logger.info(f"Permission set {permission_set_name} successfully created")
+                logger.info("Permission set %s successfully created", permission_set_name)
                 return result.get("id")
             else:
                 raise Exception(f"Failed to create permission set: {result.get('errors')}")
@@ -98,12 +374,54 @@ class SalesforceManager:
             logger.error(f"Error creating permission set: {str(e)}")
             raise
 
+    def create_permission_sets(self, permission_sets: List[Dict]) -> Dict[str, str]:
+        """
+        Create several permission sets with sObject Collections requests.
+
+        The permission sets are sent in chunks of up to 200 records, so N
+        permission sets cost about N/200 requests. A permission set that fails
+        is logged and left out of the result, the others are still created.
+
+        Args:
+            permission_sets (List[Dict]): PermissionSet field values, each with a Name
+
+        Returns:
+            Dict[str, str]: IDs of the created permission sets keyed by name
+
+        Raises:
+            Exception: If the requests themselves fail
+        """
+        if not self.connection:
+            raise RuntimeError("No active Salesforce connection")
+
+        try:
+            logger.info("Creating %s permission sets", len(permission_sets))
+            records = [
+                {"attributes": {"type": "PermissionSet"}, **fields} for fields in permission_sets
+            ]
+            results = self._send_records("PermissionSet", records)
+
+            created = {}
+            for record, result in zip(records, results):
+                if result.get("success"):
+                    created[record["Name"]] = result.get("id")
+                else:
+                    logger.error(
+                        f"Error creating permission set {record['Name']}: {result.get('errors')}"
+                    )
+            return created
+
+        except Exception as e:
+            logger.error(f"Error creating permission sets: {str(e)}")
+            raise
+
     def set_field_permissions(
         self,
         permission_set_name: str,
         object_name: str,
         fields: List[str],
         access_level: str = "read",
+        check_existing: bool = True,
     ) -> None:
         """
         Set field permissions for a given permission set.
@@ -113,43 +431,180 @@ class SalesforceManager:
             object_name (str): Name of the Salesforce object
             fields (List[str]): List of fields to set permissions for
             access_level (str, optional): Access level ('read' or 'edit'). Defaults to 'read'.
+            check_existing (bool, optional): Look up the permission set's current field
+                permissions first; a permission set created just now has none. Defaults to True.
 
         Raises:
             Exception: If setting field permissions fails
-            ValueError: If invalid access_level is provided
+            ValueError: If invalid access_level is provided or PRAVATOR_BULK_THRESHOLD
+                is not an integer
         """
         if not self.connection:
             raise RuntimeError("No active Salesforce connection")
 
-        if access_level not in ["read", "edit"]:
+        if access_level not in _VALID_ACCESS:
             raise ValueError("access_level must be either 'read' or 'edit'")
 
-        try:
-            logger.info(f"Setting permissions for {len(fields)} fields in object {object_name}")
-
-            for field in fields:
-                field_permission = {
-                    "Field": f"{object_name}.{field}",
-                    "PermissionsRead": True if access_level in ["read", "edit"] else False,
-                    "PermissionsEdit": True if access_level == "edit" else False,
-                    "ParentId": permission_set_name,
-                }
+        if not fields:
+            return
 
-                result = self.connection.FieldPermissions.create(field_permission)
+        if self._bulk_threshold is None:
+            self._bulk_threshold = _positive_int_env("PRAVATOR_BULK_THRESHOLD") or BULK_THRESHOLD
 
-                if result.get("success"):
-                    logger.debug(f"Permissions for field {field} successfully set")
-                else:
-                    raise Exception(
-                        f"Failed to set permissions for field {field}: {result.get('errors')}"
-                    )
-
-            logger.info(f"Permissions for all fields successfully set")
+        try:
+            logger.info("Setting permissions for %s fields in object %s", len(fields), object_name)
+
+            permissions_edit = _ACCESS_EDIT[access_level]
+
+            # Fields that already have exactly the requested access need no write,
+            # fields with a different access are updated, a second insert would fail
+            rows = {}
+            if check_existing:
+                existing = self.connection.query_all(
+                    format_soql(EXISTING_FIELD_PERMISSIONS_QUERY, permission_set_name, object_name)
+                )
+                rows = {record["Field"]: record for record in existing["records"]}
+            prefix = f"{object_name}."
+            missing, changed = [], []
+            for field in fields:
+                row = rows.get(prefix + field)
+                if row is None:
+                    missing.append(field)
+                elif not row["PermissionsRead"] or row["PermissionsEdit"] != permissions_edit:
+                    changed.append((field, row["Id"]))
+            skipped = len(fields) - len(missing) - len(changed)
+            if skipped:
+                logger.info("Skipping %s fields that are already set", skipped)
+            if not missing and not changed:
+                return
+
+            failures = []
+            if changed:
+                failures += self._update_field_permissions(changed, permissions_edit)
+            if len(missing) >= self._bulk_threshold:
+                failures += self._insert_field_permissions_bulk(
+                    permission_set_name, object_name, missing, permissions_edit
+                )
+            elif missing:
+                failures += self._insert_field_permissions_rest(
+                    permission_set_name, object_name, missing, permissions_edit
+                )
+
+            if failures:
+                raise Exception(
+                    f"Failed to set permissions for {len(failures)} fields: {'; '.join(failures)}"
+                )
+
+            logger.info("Permissions for all fields successfully set")
 
         except Exception as e:
             logger.error(f"Error setting permissions: {str(e)}")
             raise
 
+    def _send_records(self, endpoint: str, records: List[Dict], method: str = "POST") -> List[Dict]:
+        """
+        Send records through sObject Collections and return one result per record.
+
+        Records are sent in chunks of up to 200 and must carry their own
+        attributes.type. Chunks are not all-or-none, so every record is
+        attempted; the caller decides what to do with the failed ones.
+        """
+        chunks = [
+            records[start : start + COLLECTIONS_BATCH_SIZE]
+            for start in range(0, len(records), COLLECTIONS_BATCH_SIZE)
+        ]
+
+        @_retry()
+        def send(chunk: List[Dict]) -> List[Dict]:
+            with self._limited(endpoint):
+                return self.connection.restful(
+                    "composite/sobjects",
+                    method=method,
+                    json={"allOrNone": False, "records": chunk},
+                )
+
+        if len(chunks) > 1:
+            # The requests are independent, keep a few of them in flight
+            with ThreadPoolExecutor(max_workers=min(CONCURRENT_REQUESTS, len(chunks))) as executor:
+                responses = list(executor.map(send, chunks))
+        else:
+            responses = [send(chunk) for chunk in chunks]
+        return [result for results in responses for result in results]
+
+    def _update_field_permissions(
+        self, changed: List[Tuple[str, str]], permissions_edit: bool
+    ) -> List[str]:
+        """Update the access of existing FieldPermissions and return the failures."""
+        records = [
+            {
+                "attributes": {"type": "FieldPermissions"},
+                "Id": record_id,
+                "PermissionsRead": True,
+                "PermissionsEdit": permissions_edit,
+            }
+            for _, record_id in changed
+        ]
+        results = self._send_records("FieldPermissions", records, method="PATCH")
+        return [
+            f"{field}: {result.get('errors')}"
+            for (field, _), result in zip(changed, results)
+            if not result.get("success")
+        ]
+
+    def _insert_field_permissions_rest(
+        self, permission_set_id: str, object_name: str, fields: List[str], permissions_edit: bool
+    ) -> List[str]:
+        """Insert FieldPermissions through sObject Collections and return the failures."""
+        # Values shared by every record, only Field differs
+        template = {
+            "attributes": {"type": "FieldPermissions"},
+            "PermissionsRead": True,
+            "PermissionsEdit": permissions_edit,
+            "ParentId": permission_set_id,
+            "SobjectType": object_name,
+        }
+        prefix = f"{object_name}."
+        records = [{**template, "Field": prefix + field} for field in fields]
+        results = self._send_records("FieldPermissions", records)
+
+        # Report every failed field at the end
+        failures = []
+        debug = logger.isEnabledFor(logging.DEBUG)
+        for field, result in zip(fields, results):
+            if result.get("success"):
+                if debug:
+                    logger.debug("Permissions for field %s successfully set", field)
+            else:
+                failures.append(f"{field}: {result.get('errors')}")
+        return failures
+
+    def _insert_field_permissions_bulk(
+        self, permission_set_id: str, object_name: str, fields: List[str], permissions_edit: bool
+    ) -> List[str]:
+        """Insert FieldPermissions with a Bulk API 2.0 job and return the failures."""
+        logger.info("Loading %s field permissions with Bulk API 2.0", len(fields))
+        # Bulk jobs take CSV, booleans are sent as their literal values
+        template = {
+            "PermissionsRead": "true",
+            "PermissionsEdit": "true" if permissions_edit else "false",
+            "ParentId": permission_set_id,
+            "SobjectType": object_name,
+        }
+        prefix = f"{object_name}."
+        records = [{**template, "Field": prefix + field} for field in fields]
+
+        bulk = self.connection.bulk2.FieldPermissions
+        failures = []
+        with self._limited("FieldPermissions"):
+            jobs = bulk.insert(records=records)
+        for job in jobs:
+            if job["numberRecordsFailed"]:
+                failed = bulk.get_failed_records(job["job_id"])
+                for row in csv.DictReader(io.StringIO(failed)):
+                    field = row["Field"].split(".", 1)[-1]
+                    failures.append(f"{field}: {row['sf__Error']}")
+        return failures
+
     def create_edit_permission_set(self, object_name: str) -> str:
         """
         Create an edit permission set for a given Salesforce object.
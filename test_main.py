@@ -1,9 +0,0 @@
-import unittest
-from main import main
-
-class TestMain(unittest.TestCase):
-    def test_main(self):
-        self.assertIsNone(main())
-
-if __name__ == '__main__':
-    unittest.main()
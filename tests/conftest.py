@@ -0,0 +1,34 @@
+from unittest.mock import MagicMock
+
+import pytest
+from simple_salesforce import Salesforce
+
+from src.config import loader
+
+
+@pytest.fixture(autouse=True)
+def clear_config_cache():
+    """Parsed configurations must not leak from one test into another."""
+    loader._config_cache.clear()
+    yield
+    loader._config_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def mock_sleep(monkeypatch):
+    """Retries back off with time.sleep; tests must not actually wait."""
+    sleep = MagicMock()
+    monkeypatch.setattr("time.sleep", sleep)
+    return sleep
+
+
+@pytest.fixture
+def sf_connection():
+    """Connection mock that only allows what simple_salesforce.Salesforce provides."""
+    connection = MagicMock(spec=Salesforce)
+    # Set on the instance or resolved by Salesforce.__getattr__, so not part of the spec
+    connection.PermissionSet = MagicMock()
+    connection.FieldPermissions = MagicMock()
+    connection.bulk2 = MagicMock()
+    connection.session = MagicMock()
+    return connection
@@ -0,0 +1,93 @@
+import os
+from unittest.mock import patch
+
+import pytest
+import yaml
+
+from src.config import loader
+from src.config.loader import ConfigError, load_config
+from src.config.templates import STANDARD_RESTRICTED_FIELDS, create_config_template
+
+
+class TestConfig:
+    def test_load_config(self, tmp_path):
+        config_file = tmp_path / "Account.yaml"
+        config_file.write_text("fields:\n  read:\n    - Name\n  edit:\n    - Rating\n")
+
+        assert load_config(str(config_file)) == {"fields": {"read": ["Name"], "edit": ["Rating"]}}
+
+    def test_load_config_cached_until_modified(self, tmp_path):
+        config_file = tmp_path / "Account.yaml"
+        config_file.write_text("fields:\n  read:\n    - Name\n")
+
+        with patch("yaml.load", wraps=yaml.load) as mock_load:
+            first = load_config(str(config_file))
+            assert load_config(str(config_file)) is first
+            assert mock_load.call_count == 1
+
+            config_file.write_text("fields:\n  read:\n    - Rating\n")
+            stat = os.stat(config_file)
+            os.utime(config_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            assert load_config(str(config_file)) == {"fields": {"read": ["Rating"]}}
+            assert mock_load.call_count == 2
+
+    def test_load_config_json_sidecar(self, tmp_path):
+        config_file = tmp_path / "Account.yaml"
+        config_file.write_text("fields:\n  read:\n    - Name\n")
+        expected = {"fields": {"read": ["Name"]}}
+
+        assert load_config(str(config_file)) == expected
+        assert (tmp_path / ".cache" / "Account.json").exists()
+
+        # A new run starts with an empty in-memory cache
+        loader._config_cache.clear()
+        with patch("yaml.load") as mock_load:
+            assert load_config(str(config_file)) == expected
+            mock_load.assert_not_called()
+
+    def test_load_config_invalid_yaml(self, tmp_path):
+        config_file = tmp_path / "Invalid.yaml"
+        config_file.write_text("invalid: yaml: content:")
+
+        with pytest.raises(ConfigError, match=r"^Invalid YAML in "):
+            load_config(str(config_file))
+
+    def test_load_config_sidecar_not_serializable(self, tmp_path):
+        config_file = tmp_path / "Account.yaml"
+        config_file.write_text("created: 2024-03-19\n")
+
+        assert str(load_config(str(config_file))["created"]) == "2024-03-19"
+        assert os.listdir(tmp_path / ".cache") == []
+
+    def test_load_config_sidecar_non_string_keys(self, tmp_path):
+        config_file = tmp_path / "Account.yaml"
+        config_file.write_text("fields:\n  1: Name\n")
+
+        assert load_config(str(config_file)) == {"fields": {1: "Name"}}
+        assert not (tmp_path / ".cache" / "Account.json").exists()
+
+    def test_create_config_template(self, tmp_path):
+        fields = [
+            {"name": "Id", "updateable": False},
+            {"name": "Name", "updateable": True},
+            {"name": "AccountNumber", "updateable": False},
+        ]
+        record_types = [{"DeveloperName": "Customer"}, {"DeveloperName": "Partner"}]
+
+        config_path = create_config_template("Account", record_types, fields, str(tmp_path))
+
+        assert config_path == str(tmp_path / "Account.yaml")
+        with open(config_path) as f:
+            assert f.readline() == "# Configuration for Account object permissions\n"
+            f.seek(0)
+            template = yaml.safe_load(f)
+        assert list(template) == ["record_types", "fields", "restricted_fields"]
+        assert template["record_types"] == ["Customer", "Partner"]
+        assert template["fields"] == {"read": ["Name", "AccountNumber"], "edit": ["Name"]}
+        assert template["restricted_fields"] == STANDARD_RESTRICTED_FIELDS
+
+    def test_create_config_template_master(self, tmp_path):
+        config_path = create_config_template("Custom__c", [], [], str(tmp_path))
+
+        with open(config_path) as f:
+            assert yaml.safe_load(f)["record_types"] == ["Master"]
@@ -1,82 +1,17 @@
+import gzip
+import json
+import logging
 import os
-from unittest.mock import MagicMock, patch
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from operator import attrgetter
+from unittest.mock import ANY, MagicMock, call, patch
 
 import pytest
+from simple_salesforce.exceptions import SalesforceResourceNotFound
 
-
-@pytest.fixture
-def mock_modules():
-    mock_loader = MagicMock()
-    mock_templates = MagicMock()
-    mock_sfdc_manager = MagicMock()
-    mock_sfdc_manager.connect.return_value.__enter__.return_value = MagicMock()
-    mock_sfdc_manager.connect.return_value.__exit__.return_value = None
-    mock_sfdc_manager.get_api_usage.return_value = (100, 200)  # (remaining, max_requests)
-
-    with patch("src.main.load_config", mock_loader), patch(
-        "src.main.create_config_template", mock_templates
-    ), patch("src.main.sfdc_manager", mock_sfdc_manager):
-        yield {
-            "loader": mock_loader,
-            "templates": mock_templates,
-            "sfdc_manager": mock_sfdc_manager,
-        }
-
-
-class TestMain:
-    def test_get_all_objects_success(self, mock_modules):
-        mock_connection = mock_modules["sfdc_manager"].connect.return_value.__enter__.return_value
-        mock_connection.describe.return_value = {
-            "sobjects": [{"name": "Account"}, {"name": "Contact"}]
-        }
-
-        from src.main import get_all_objects
-
-        result = get_all_objects()
-        assert result == ["Account", "Contact"]
-        mock_connection.describe.assert_called_once()
-
-    def test_get_all_objects_failure(self, mock_modules):
-        mock_connection = mock_modules["sfdc_manager"].connect.return_value.__enter__.return_value
-        mock_connection.describe.side_effect = Exception("API Error")
-
-        from src.main import get_all_objects
-
-        with pytest.raises(Exception) as exc_info:
-            get_all_objects()
-        assert str(exc_info.value) == "API Error"
-
-    def test_get_custom_objects_success(self, mock_modules):
-        mock_connection = mock_modules["sfdc_manager"].connect.return_value.__enter__.return_value
-        mock_connection.describe.return_value = {
-            "sobjects": [
-                {"name": "Account", "custom": False},
-                {"name": "Custom__c", "custom": True},
-            ]
-        }
-
-        from src.main import get_custom_objects
-
-        result = get_custom_objects()
-        assert result == ["Custom__c"]
-        mock_connection.describe.assert_called_once()
-
-    def test_get_custom_objects_failure(self, mock_modules):
-        mock_connection = mock_modules["sfdc_manager"].connect.return_value.__enter__.return_value
-        mock_connection.describe.side_effect = Exception("API Error")
-
-        from src.main import get_custom_objects
-
-        with pytest.raises(Exception) as exc_info:
-            get_custom_objects()
-        assert str(exc_info.value) == "API Error"
-
-    def test_load_object_config_success(self, mock_modules, tmp_path):
-        config_dir = tmp_path / "config"
-        config_dir.mkdir()
-        config_file = config_dir / "Account.yaml"
-        config_file.write_text(
-            """
+ACCOUNT_YAML = """\
 record_types:
   - Customer
   - Partner
@@ -131,71 +66,175 @@ restricted_fields:
   - JigsawCompanyId
   - CleanStatus
 """
-        )
 
-        expected_config = {
-            "record_types": ["Customer", "Partner", "Supplier"],
-            "fields": {
-                "read": [
-                    "Name",
-                    "Description",
-                    "Industry",
-                    "Type",
-                    "Website",
-                    "Phone",
-                    "BillingAddress",
-                    "ShippingAddress",
-                    "AccountNumber",
-                    "Site",
-                    "AccountSource",
-                    "AnnualRevenue",
-                    "NumberOfEmployees",
-                    "Ownership",
-                    "TickerSymbol",
-                    "Rating",
-                    "ParentId",
-                    "CreatedDate",
-                    "LastModifiedDate",
-                ],
-                "edit": [
-                    "Name",
-                    "Description",
-                    "Industry",
-                    "Type",
-                    "Website",
-                    "Phone",
-                    "BillingStreet",
-                    "BillingCity",
-                    "BillingState",
-                    "BillingPostalCode",
-                    "BillingCountry",
-                    "ShippingStreet",
-                    "ShippingCity",
-                    "ShippingState",
-                    "ShippingPostalCode",
-                    "ShippingCountry",
-                    "AccountSource",
-                    "AnnualRevenue",
-                    "NumberOfEmployees",
-                    "Rating",
-                ],
-            },
-            "restricted_fields": [
-                "OwnerId",
-                "SystemModstamp",
-                "LastActivityDate",
-                "Jigsaw",
-                "JigsawCompanyId",
-                "CleanStatus",
-            ],
+ACCOUNT_CONFIG = {
+    "record_types": ["Customer", "Partner", "Supplier"],
+    "fields": {
+        "read": [
+            "Name",
+            "Description",
+            "Industry",
+            "Type",
+            "Website",
+            "Phone",
+            "BillingAddress",
+            "ShippingAddress",
+            "AccountNumber",
+            "Site",
+            "AccountSource",
+            "AnnualRevenue",
+            "NumberOfEmployees",
+            "Ownership",
+            "TickerSymbol",
+            "Rating",
+            "ParentId",
+            "CreatedDate",
+            "LastModifiedDate",
+        ],
+        "edit": [
+            "Name",
+            "Description",
+            "Industry",
+            "Type",
+            "Website",
+            "Phone",
+            "BillingStreet",
+            "BillingCity",
+            "BillingState",
+            "BillingPostalCode",
+            "BillingCountry",
+            "ShippingStreet",
+            "ShippingCity",
+            "ShippingState",
+            "ShippingPostalCode",
+            "ShippingCountry",
+            "AccountSource",
+            "AnnualRevenue",
+            "NumberOfEmployees",
+            "Rating",
+        ],
+    },
+    "restricted_fields": [
+        "OwnerId",
+        "SystemModstamp",
+        "LastActivityDate",
+        "Jigsaw",
+        "JigsawCompanyId",
+        "CleanStatus",
+    ],
+}
+
+
+@pytest.fixture(scope="module")
+def account_config_dir(tmp_path_factory):
+    """Working directory with config/Account.yaml, written once per module."""
+    root = tmp_path_factory.mktemp("cfg")
+    (root / "config").mkdir()
+    (root / "config" / "Account.yaml").write_text(ACCOUNT_YAML)
+    return root
+
+
+@pytest.fixture
+def in_config_dir(tmp_path, monkeypatch):
+    """Run from a directory whose config/ holds Account.yaml and Order6__c.yaml."""
+    (tmp_path / "config").mkdir()
+    for object_name in ("Account", "Order6__c"):
+        (tmp_path / "config" / f"{object_name}.yaml").write_text("fields: {}\n")
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
+
+
+@pytest.fixture
+def mock_modules():
+    mock_loader = MagicMock()
+    mock_templates = MagicMock()
+    mock_sfdc_manager = MagicMock()
+    mock_sfdc_manager.connect.return_value.__enter__.return_value = MagicMock()
+    mock_sfdc_manager.connect.return_value.__exit__.return_value = None
+    mock_sfdc_manager.get_api_usage.return_value = (100, 200)  # (remaining, max_requests)
+    mock_sfdc_manager.create_permission_sets.side_effect = lambda permission_sets: {
+        permission_set["Name"]: f"0PS{i}" for i, permission_set in enumerate(permission_sets)
+    }
+
+    with patch("src.main.load_config", mock_loader), patch(
+        "src.main.create_config_template", mock_templates
+    ), patch("src.salesforce_manager.sfdc_manager", mock_sfdc_manager):
+        yield {
+            "loader": mock_loader,
+            "templates": mock_templates,
+            "sfdc_manager": mock_sfdc_manager,
+        }
+
+
+@pytest.fixture
+def run_main(monkeypatch):
+    """Run the CLI entry point with the given command line arguments."""
+
+    def run(*args):
+        monkeypatch.setattr("sys.argv", ["main.py", *args])
+        from src.main import main
+
+        main()
+
+    return run
+
+
+class TestMain:
+    @pytest.mark.parametrize(
+        "function_name, expected",
+        [
+            ("get_all_objects", ["Account", "Custom__c"]),
+            ("get_custom_objects", ["Custom__c"]),
+        ],
+    )
+    def test_get_objects_success(self, mock_modules, function_name, expected):
+        mock_connection = mock_modules["sfdc_manager"].connect.return_value.__enter__.return_value
+        mock_connection.describe.return_value = {
+            "sobjects": [
+                {"name": "Account", "custom": False},
+                {"name": "Custom__c", "custom": True},
+            ]
+        }
+
+        import src.main
+
+        result = getattr(src.main, function_name)(mock_connection)
+        assert result == expected
+        mock_connection.describe.assert_called_once()
+
+    def test_get_all_objects_reuses_describe(self, mock_modules):
+        mock_connection = mock_modules["sfdc_manager"].connect.return_value.__enter__.return_value
+        mock_connection.describe.return_value = {
+            "sobjects": [
+                {"name": "Account", "custom": False},
+                {"name": "Custom__c", "custom": True},
+            ]
         }
 
-        mock_modules["loader"].return_value = expected_config
-        with patch("src.main.os.getcwd", return_value=str(tmp_path)):
-            from src.main import load_object_config
+        from src.main import get_all_objects, get_custom_objects
+
+        assert get_all_objects(mock_connection) == ["Account", "Custom__c"]
+        assert get_custom_objects(mock_connection) == ["Custom__c"]
+        mock_connection.describe.assert_called_once()
+
+    @pytest.mark.parametrize("function_name", ["get_all_objects", "get_custom_objects"])
+    def test_get_objects_failure(self, mock_modules, function_name):
+        mock_connection = mock_modules["sfdc_manager"].connect.return_value.__enter__.return_value
+        mock_connection.describe.side_effect = Exception("API Error")
+
+        import src.main
+
+        with pytest.raises(Exception, match=r"^API Error$"):
+            getattr(src.main, function_name)(mock_connection)
+
+    def test_load_object_config_success(self, mock_modules, account_config_dir, monkeypatch):
+        mock_modules["loader"].return_value = ACCOUNT_CONFIG
+        monkeypatch.chdir(account_config_dir)
+
+        from src.main import load_object_config
 
-            result = load_object_config("Account")
-            assert result == expected_config
+        assert load_object_config("Account") == ACCOUNT_CONFIG
+        mock_modules["loader"].assert_called_once_with(os.path.join("config", "Account.yaml"))
 
     def test_load_object_config_file_not_found(self, mock_modules):
         from src.main import load_object_config
@@ -203,47 +242,419 @@ restricted_fields:
         with pytest.raises(FileNotFoundError):
             load_object_config("NonExistentObject")
 
-    def test_load_object_config_invalid_yaml(self, mock_modules, tmp_path):
+    def test_load_object_config_invalid_yaml(self, mock_modules, tmp_path, monkeypatch):
         config_dir = tmp_path / "config"
         config_dir.mkdir()
         config_file = config_dir / "Invalid.yaml"
         config_file.write_text("invalid: yaml: content:")
+        monkeypatch.chdir(tmp_path)
 
         mock_modules["loader"].side_effect = Exception("Invalid YAML")
-        with patch("src.main.os.getcwd", return_value=str(tmp_path)):
-            from src.main import load_object_config
+        from src.main import load_object_config
 
-            with pytest.raises(Exception):
-                load_object_config("Invalid")
+        with pytest.raises(Exception, match=r"^Invalid YAML$"):
+            load_object_config("Invalid")
 
-    def test_setup_permissions_success(self, mock_modules):
-        mock_connection = mock_modules["sfdc_manager"].connect.return_value.__enter__.return_value
-        mock_connection.PermissionSet.create.return_value = {"success": True, "id": "123"}
-        mock_connection.FieldPermissions.create.return_value = {"success": True}
+    def test_describe_fetched_once_across_threads(self, mock_modules):
+        mock_connection = MagicMock()
+        # time.sleep is mocked for every test, make the describe slow with a real wait
+        mock_connection.describe.side_effect = lambda: threading.Event().wait(0.05) or {
+            "sobjects": []
+        }
+
+        from src.main import _cached_describe
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            list(executor.map(lambda _: _cached_describe(mock_connection), range(4)))
+        mock_connection.describe.assert_called_once()
+
+    def test_check_permission_set_exists(self, mock_modules):
+        mock_connection = MagicMock()
+        mock_connection.query.return_value = {"totalSize": 1, "records": [{"Id": "0PS"}]}
+
+        from src.main import check_permission_set_exists
+
+        assert check_permission_set_exists(mock_connection, "Account_read_Permissions") is True
+        mock_connection.query.assert_called_once_with(
+            "SELECT COUNT() FROM PermissionSet WHERE Name = 'Account_read_Permissions'"
+        )
+        mock_modules["sfdc_manager"].connect.assert_not_called()
+
+    def test_check_permission_set_exists_escapes_name(self, mock_modules):
+        mock_connection = MagicMock()
+        mock_connection.query.return_value = {"totalSize": 0, "records": []}
+
+        from src.main import check_permission_set_exists
+
+        assert check_permission_set_exists(mock_connection, "x' OR Name != 'y") is False
+        mock_connection.query.assert_called_once_with(
+            r"SELECT COUNT() FROM PermissionSet WHERE Name = 'x\' OR Name != \'y'"
+        )
+
+    def test_check_permission_set_exists_failure(self, mock_modules):
+        mock_connection = MagicMock()
+        mock_connection.query.side_effect = Exception("API Error")
+
+        from src.main import check_permission_set_exists
+
+        assert check_permission_set_exists(mock_connection, "Account_read_Permissions") is False
+
+    def test_get_record_types(self, mock_modules):
+        mock_connection = MagicMock()
+        mock_connection.query.return_value = {
+            "done": True,
+            "records": [{"DeveloperName": "Customer"}],
+        }
+
+        from src.main import get_record_types
+
+        assert list(get_record_types(mock_connection, "Account")) == [{"DeveloperName": "Customer"}]
+        mock_connection.query.assert_called_once_with(
+            "SELECT Id, Name, DeveloperName, IsActive FROM RecordType "
+            "WHERE SobjectType = 'Account' AND IsActive = true"
+        )
+        mock_modules["sfdc_manager"].connect.assert_not_called()
+
+    def test_get_record_types_failure(self, mock_modules):
+        mock_connection = MagicMock()
+        mock_connection.query.side_effect = Exception("API Error")
+
+        from src.main import get_record_types
+
+        assert list(get_record_types(mock_connection, "Account")) == []
+
+    def test_get_record_types_query_more(self, mock_modules):
+        mock_connection = MagicMock()
+        mock_connection.query.return_value = {
+            "done": False,
+            "nextRecordsUrl": "/services/data/v59.0/query/01g-2000",
+            "records": [{"DeveloperName": "Customer"}],
+        }
+        mock_connection.query_more.return_value = {
+            "done": True,
+            "records": [{"DeveloperName": "Partner"}],
+        }
+
+        from src.main import get_record_types
+
+        record_types = get_record_types(mock_connection, "Account")
+        mock_connection.query.assert_not_called()
+        assert [rt["DeveloperName"] for rt in record_types] == ["Customer", "Partner"]
+        mock_connection.query_more.assert_called_once_with(
+            "/services/data/v59.0/query/01g-2000", identifier_is_url=True
+        )
+
+    def test_get_record_types_by_object(self, mock_modules):
+        mock_connection = MagicMock()
+        mock_connection.query_all.return_value = {
+            "records": [
+                {"SobjectType": "Account", "DeveloperName": "Customer"},
+                {"SobjectType": "Account", "DeveloperName": "Partner"},
+                {"SobjectType": "Case", "DeveloperName": "Support"},
+            ]
+        }
+
+        from src.main import get_record_types_by_object
+
+        result = get_record_types_by_object(mock_connection, ["Account", "Case", "Contact"])
+        assert [rt["DeveloperName"] for rt in result["Account"]] == ["Customer", "Partner"]
+        assert [rt["DeveloperName"] for rt in result["Case"]] == ["Support"]
+        assert "Contact" not in result
+        mock_connection.query_all.assert_called_once_with(
+            "SELECT Id, Name, DeveloperName, IsActive, SobjectType FROM RecordType "
+            "WHERE SobjectType IN ('Account','Case','Contact') AND IsActive = true"
+        )
+
+    def test_get_record_types_by_object_composite(self, mock_modules):
+        mock_connection = MagicMock()
+        mock_connection.sf_version = "59.0"
+        pages = [
+            {"done": True, "records": [{"SobjectType": "Object0__c", "DeveloperName": "A"}]},
+            {"done": False, "nextRecordsUrl": "/next", "records": []},
+        ]
+        mock_connection.restful.return_value = {
+            "results": [{"statusCode": 200, "result": page} for page in pages]
+        }
+        mock_connection.query_more.return_value = {
+            "done": True,
+            "records": [{"SobjectType": "Object150__c", "DeveloperName": "B"}],
+        }
+
+        from src.main import get_record_types_by_object
+
+        result = get_record_types_by_object(mock_connection, [f"Object{i}__c" for i in range(150)])
+        assert [rt["DeveloperName"] for rt in result["Object0__c"]] == ["A"]
+        assert [rt["DeveloperName"] for rt in result["Object150__c"]] == ["B"]
+        mock_connection.query_all.assert_not_called()
+        batch_requests = mock_connection.restful.call_args.kwargs["json"]["batchRequests"]
+        assert len(batch_requests) == 2
+        assert batch_requests[0]["url"].startswith("v59.0/query?q=SELECT%20Id")
+        mock_connection.query_more.assert_called_once_with("/next", identifier_is_url=True)
+
+    def test_get_fields(self, mock_modules):
+        mock_connection = MagicMock()
+        mock_connection.query_all.return_value = {
+            "records": [
+                {"QualifiedApiName": "Name", "IsUpdatable": True},
+                {"QualifiedApiName": "Id", "IsUpdatable": False},
+            ]
+        }
+
+        from src.main import get_fields
+
+        assert get_fields(mock_connection, "Account") == [
+            {"name": "Name", "updateable": True},
+            {"name": "Id", "updateable": False},
+        ]
+        mock_connection.query_all.assert_called_once_with(
+            "SELECT QualifiedApiName, IsUpdatable FROM EntityParticle "
+            "WHERE EntityDefinition.QualifiedApiName = 'Account'"
+        )
+
+    def test_create_object_config_template(self, mock_modules):
+        mock_connection = MagicMock()
+        mock_connection.query.return_value = {"done": True, "records": []}
+        mock_connection.query_all.return_value = {
+            "records": [{"QualifiedApiName": "Name", "IsUpdatable": True}]
+        }
+
+        from src.main import create_object_config_template
+
+        create_object_config_template(mock_connection, "Account")
+        mock_connection.Account.describe.assert_not_called()
+        mock_modules["templates"].assert_called_once_with(
+            "Account", [], [{"name": "Name", "updateable": True}]
+        )
 
+    def test_process_objects_templates_query_record_types_once(self, mock_modules):
+        mock_connection = MagicMock()
+        mock_connection.query_all.side_effect = lambda query: {
+            "records": (
+                [{"SobjectType": "Account", "DeveloperName": "Customer"}]
+                if "FROM RecordType" in query
+                else []
+            )
+        }
+
+        from src.main import process_objects
+
+        process_objects(mock_connection, ["Account", "Contact"], create_template=True)
+        mock_connection.query.assert_not_called()
+        record_type_queries = [
+            call.args[0]
+            for call in mock_connection.query_all.call_args_list
+            if "FROM RecordType" in call.args[0]
+        ]
+        assert len(record_type_queries) == 1
+        templates = {
+            call.args[0]: call.args[1] for call in mock_modules["templates"].call_args_list
+        }
+        assert [rt["DeveloperName"] for rt in templates["Account"]] == ["Customer"]
+        assert templates["Contact"] == []
+
+    def test_batch_describe(self, mock_modules):
+        mock_connection = MagicMock()
+        mock_connection.sf_version = "59.0"
+        mock_connection.restful.return_value = {
+            "hasErrors": True,
+            "results": [
+                {"statusCode": 200, "result": {"name": "Account"}},
+                {"statusCode": 404, "result": [{"errorCode": "NOT_FOUND"}]},
+            ],
+        }
+
+        from src.main import batch_describe
+
+        result = batch_describe(mock_connection, ["Account", "Missing__c"])
+        assert result == {"Account": {"name": "Account"}}
+        mock_connection.restful.assert_called_once_with(
+            "composite/batch",
+            method="POST",
+            json={
+                "batchRequests": [
+                    {"method": "GET", "url": "v59.0/sobjects/Account/describe"},
+                    {"method": "GET", "url": "v59.0/sobjects/Missing__c/describe"},
+                ]
+            },
+        )
+
+        # Cached objects are not requested again
+        assert batch_describe(mock_connection, ["Account"]) == {"Account": {"name": "Account"}}
+        mock_connection.restful.assert_called_once()
+
+    def test_batch_describe_chunks(self, mock_modules):
+        mock_connection = MagicMock()
+        mock_connection.restful.side_effect = lambda path, method, json: {
+            "results": [{"statusCode": 200, "result": {}} for _ in json["batchRequests"]]
+        }
+
+        from src.main import batch_describe
+
+        result = batch_describe(mock_connection, [f"Object{i}__c" for i in range(30)])
+        assert len(result) == 30
+        assert mock_connection.restful.call_count == 2
+
+    def test_describe_cache_persisted(self, mock_modules, monkeypatch, tmp_path):
+        monkeypatch.setenv("PRAVATOR_CACHE_DIR", str(tmp_path))
+
+        def connect(status_code, result):
+            connection = MagicMock()
+            connection.sf_instance = "example.my.salesforce.com"
+            connection.sf_version = "59.0"
+            connection.restful.return_value = {
+                "results": [{"statusCode": status_code, "result": result}]
+            }
+            return connection
+
+        from src.main import (
+            IF_MODIFIED_SINCE_MARGIN,
+            batch_describe,
+            load_describe_cache,
+            save_describe_cache,
+        )
+
+        first_run = connect(200, {"name": "Account"})
+        load_describe_cache(first_run)
+        batch_describe(first_run, ["Account"])
+        save_describe_cache(first_run)
+        with gzip.open(tmp_path / "describes-example.my.salesforce.com-59.0.json.gz") as f:
+            stored = json.load(f)["Account"]
+        assert stored[1] == {"name": "Account"}
+
+        second_run = connect(304, None)
+        load_describe_cache(second_run)
+        assert batch_describe(second_run, ["Account"]) == {"Account": {"name": "Account"}}
+        request = second_run.restful.call_args.kwargs["json"]["batchRequests"][0]
+        # Sent a margin earlier than the local fetch time, in case the clocks differ
+        since = parsedate_to_datetime(request["httpHeaders"]["If-Modified-Since"])
+        assert since.timestamp() == int(stored[0]) - IF_MODIFIED_SINCE_MARGIN
+
+    def test_describe_cache_path_expands_home(self, mock_modules, monkeypatch, tmp_path):
+        monkeypatch.setenv("HOME", str(tmp_path))
+        monkeypatch.setenv("PRAVATOR_CACHE_DIR", "~/.cache/pravator")
+        connection = MagicMock(sf_instance="example.my.salesforce.com", sf_version="59.0")
+
+        from src.main import _describe_cache_path
+
+        assert _describe_cache_path(connection) == str(
+            tmp_path / ".cache" / "pravator" / "describes-example.my.salesforce.com-59.0.json.gz"
+        )
+
+    def test_setup_permissions_success(self, mock_modules):
         config = {"fields": {"read": ["Name", "Description"], "edit": ["Status"]}}
+        created = {"Account_read_Permissions": "0PSread", "Account_edit_Permissions": "0PSedit"}
 
         from src.main import setup_permissions
 
-        setup_permissions(mock_connection, "Account", config)
-        assert mock_connection.PermissionSet.create.call_count == 2
-        assert mock_connection.FieldPermissions.create.call_count >= 3
+        setup_permissions("Account", config, {}, created)
+        assert mock_modules["sfdc_manager"].set_field_permissions.call_args_list == [
+            call("0PSread", "Account", ["Name", "Description"], "read", check_existing=False),
+            call("0PSedit", "Account", ["Status"], "edit", check_existing=False),
+        ]
 
-    def test_setup_permissions_failure(self, mock_modules):
-        mock_connection = mock_modules["sfdc_manager"].connect.return_value.__enter__.return_value
-        mock_connection.PermissionSet.create.side_effect = Exception("Permission Set Error")
+    def test_setup_permissions_dedupes_fields(self, mock_modules):
+        config = {"fields": {"read": ["Name", "Phone", "Name"], "edit": ["Name", "Name"]}}
+        created = {"Account_read_Permissions": "0PSread", "Account_edit_Permissions": "0PSedit"}
+
+        from src.main import setup_permissions
+
+        setup_permissions("Account", config, {}, created)
+        calls = mock_modules["sfdc_manager"].set_field_permissions.call_args_list
+        assert [c.args[2] for c in calls] == [["Name", "Phone"], ["Name"]]
 
+    def test_setup_permissions_reuses_existing(self, mock_modules):
         config = {"fields": {"read": ["Name"], "edit": ["Status"]}}
 
         from src.main import setup_permissions
 
-        with pytest.raises(Exception) as exc_info:
-            setup_permissions(mock_connection, "Account", config)
-        assert str(exc_info.value) == "Error setting up permissions: Permission Set Error"
+        setup_permissions(
+            "Account",
+            config,
+            {"Account_read_Permissions": "0PSread"},
+            {"Account_edit_Permissions": "0PSedit"},
+        )
+        # Only the reused permission set can already grant some of the fields
+        assert mock_modules["sfdc_manager"].set_field_permissions.call_args_list == [
+            call("0PSread", "Account", ["Name"], "read", check_existing=True),
+            call("0PSedit", "Account", ["Status"], "edit", check_existing=False),
+        ]
+
+    def test_create_missing_permission_sets(self, mock_modules):
+        from src.main import create_missing_permission_sets
+
+        created = create_missing_permission_sets(
+            ["Account", "Contact"], {"Account_read_Permissions": "0PSread"}
+        )
+        mock_modules["sfdc_manager"].create_permission_sets.assert_called_once_with(
+            [
+                {"Name": "Account_edit_Permissions", "Label": "Account Edit Permissions"},
+                {"Name": "Contact_read_Permissions", "Label": "Contact Read Permissions"},
+                {"Name": "Contact_edit_Permissions", "Label": "Contact Edit Permissions"},
+            ]
+        )
+        assert created == {
+            "Account_edit_Permissions": "0PS0",
+            "Contact_read_Permissions": "0PS1",
+            "Contact_edit_Permissions": "0PS2",
+        }
+
+    def test_create_missing_permission_sets_none_missing(self, mock_modules):
+        from src.main import create_missing_permission_sets
 
-    def test_process_objects_success(self, mock_modules):
+        existing = {"Account_read_Permissions": "0PS1", "Account_edit_Permissions": "0PS2"}
+        assert create_missing_permission_sets(["Account"], existing) == {}
+        mock_modules["sfdc_manager"].create_permission_sets.assert_not_called()
+
+    def test_get_existing_permission_sets(self, mock_modules):
+        mock_connection = MagicMock()
+        mock_connection.query_all.return_value = {
+            "records": [{"Id": "0PS1", "Name": "Account_read_Permissions"}]
+        }
+
+        from src.main import get_existing_permission_sets
+
+        names = [f"Object{i}_read_Permissions" for i in range(501)]
+        existing = get_existing_permission_sets(mock_connection, names)
+        assert existing == {"Account_read_Permissions": "0PS1"}
+        assert mock_connection.query_all.call_count == 2
+        first_query = mock_connection.query_all.call_args_list[0].args[0]
+        assert first_query.startswith(
+            "SELECT Id, Name FROM PermissionSet WHERE Name IN ('Object0_read_Permissions',"
+        )
+
+    def test_get_existing_permission_sets_failure(self, mock_modules):
+        mock_connection = MagicMock()
+        mock_connection.query_all.side_effect = Exception("API Error")
+
+        from src.main import get_existing_permission_sets
+
+        assert get_existing_permission_sets(mock_connection, ["Account_read_Permissions"]) == {}
+
+    def test_setup_permissions_failure(self, mock_modules):
+        config = {"fields": {"read": ["Name"], "edit": ["Status"]}}
+
+        from src.main import setup_permissions
+
+        with pytest.raises(
+            Exception,
+            match=r"^Error setting up permissions: Permission set Account_edit_Permissions "
+            r"was not created$",
+        ):
+            setup_permissions("Account", config, {"Account_read_Permissions": "0PSread"})
+
+    def test_setup_permissions_field_failure(self, mock_modules):
+        mock_modules["sfdc_manager"].set_field_permissions.side_effect = Exception(
+            "Failed to set permissions for 1 fields: Bad"
+        )
+        existing = {"Account_read_Permissions": "0PS1", "Account_edit_Permissions": "0PS2"}
+
+        from src.main import setup_permissions
+
+        with pytest.raises(Exception, match=r"^Error setting up permissions: Failed to set"):
+            setup_permissions("Account", {"fields": {"read": ["Bad"]}}, existing)
+
+    def test_process_objects_success(self, mock_modules, in_config_dir):
         mock_connection = mock_modules["sfdc_manager"].connect.return_value.__enter__.return_value
-        mock_connection.PermissionSet.create.return_value = {"success": True, "id": "123"}
 
         objects = ["Account"]
         config = {"fields": {"read": ["Name"], "edit": ["Status"]}}
@@ -252,70 +663,197 @@ restricted_fields:
         from src.main import process_objects
 
         process_objects(mock_connection, objects)
-        mock_connection.PermissionSet.create.assert_called()
+        mock_modules["sfdc_manager"].create_permission_sets.assert_called_once()
+        assert mock_modules["sfdc_manager"].set_field_permissions.call_count == 2
 
-    def test_process_objects_config_error(self, mock_modules):
+    def test_process_objects_concurrently(self, mock_modules, in_config_dir, monkeypatch):
+        monkeypatch.setenv("PRAVATOR_WORKERS", "2")
         mock_connection = mock_modules["sfdc_manager"].connect.return_value.__enter__.return_value
-        objects = ["Account", "Invalid"]
 
-        mock_modules["loader"].side_effect = FileNotFoundError
+        mock_modules["loader"].return_value = {"fields": {"read": ["Name"], "edit": ["Status"]}}
         from src.main import process_objects
 
-        process_objects(mock_connection, objects)
-        mock_connection.PermissionSet.create.assert_not_called()
+        process_objects(mock_connection, ["Account", "Order6__c"])
+        # All four permission sets are created with one call before the objects run
+        mock_modules["sfdc_manager"].create_permission_sets.assert_called_once()
+        (permission_sets,) = mock_modules["sfdc_manager"].create_permission_sets.call_args.args
+        assert len(permission_sets) == 4
+        assert mock_modules["sfdc_manager"].set_field_permissions.call_count == 4
+
+    def test_process_objects_continues_after_failure(self, mock_modules):
+        mock_connection = MagicMock()
+
+        def setup(object_name, *args):
+            if object_name == "Account":
+                raise Exception("Permission Set Error")
+
+        with patch("src.main.load_object_config", return_value={"fields": {}}), patch(
+            "src.main._configured_objects", side_effect=lambda objects: objects
+        ), patch("src.main.setup_permissions", side_effect=setup) as mock_setup:
+            from src.main import process_objects
+
+            with pytest.raises(Exception, match=r"^Failed to process 1 objects: Account$"):
+                process_objects(mock_connection, ["Account", "Contact", "Lead"])
+        processed = sorted(call.args[0] for call in mock_setup.call_args_list)
+        assert processed == ["Account", "Contact", "Lead"]
+
+    def test_process_objects_reports_salesforce_errors(self, mock_modules, monkeypatch):
+        mock_connection = MagicMock()
+        mock_connection.Foo__c.describe.side_effect = SalesforceResourceNotFound(
+            "https://example.my.salesforce.com", 404, "Foo__c", b"NOT_FOUND"
+        )
 
-    def test_main_all_objects(self, mock_modules):
-        mock_connection = mock_modules["sfdc_manager"].connect.return_value.__enter__.return_value
-        mock_connection.describe.return_value = {
-            "sobjects": [{"name": "Account"}, {"name": "Contact"}]
-        }
-        mock_connection.PermissionSet.create.return_value = {"success": True, "id": "123"}
+        import src.main
 
-        config = {"fields": {"read": ["Name"], "edit": ["Status"]}}
+        monkeypatch.setattr(src.main.logger, "isEnabledFor", lambda level: True)
+        with patch("src.main.load_object_config", return_value={"fields": {}}), patch(
+            "src.main._configured_objects", side_effect=lambda objects: objects
+        ), patch("src.main.setup_permissions") as mock_setup:
+            with pytest.raises(Exception, match=r"^Failed to process 1 objects: Foo__c$"):
+                src.main.process_objects(mock_connection, ["Foo__c"], verbose=True)
+        mock_setup.assert_not_called()
 
-        mock_modules["loader"].return_value = config
-        with patch("sys.argv", ["main.py", "--all"]):
-            from src.main import main
+    def test_process_objects_skips_record_types_when_quiet(
+        self, mock_modules, in_config_dir, monkeypatch
+    ):
+        mock_connection = MagicMock()
+        mock_modules["loader"].return_value = {"fields": {"read": ["Name"], "edit": ["Status"]}}
 
-            main()
-            mock_connection.describe.assert_called()
+        import src.main
+        from src.main import process_objects
 
-    def test_main_custom_objects(self, mock_modules):
-        mock_connection = mock_modules["sfdc_manager"].connect.return_value.__enter__.return_value
-        mock_connection.describe.return_value = {
-            "sobjects": [
-                {"name": "Account", "custom": False},
-                {"name": "Custom__c", "custom": True},
-            ]
+        monkeypatch.setattr(src.main.logger, "isEnabledFor", lambda level: False)
+        process_objects(mock_connection, ["Account"])
+        queries = [call.args[0] for call in mock_connection.query_all.call_args_list]
+        assert not any("FROM RecordType" in query for query in queries)
+        mock_modules["sfdc_manager"].set_field_permissions.assert_called()
+
+    def test_process_objects_verbose(self, mock_modules, in_config_dir, monkeypatch):
+        describe = {
+            "label": "Account",
+            "name": "Account",
+            "custom": False,
+            "fields": [{"name": "Name"}, {"name": "OwnerId"}],
+        }
+        mock_connection = MagicMock()
+        mock_connection.restful.return_value = {
+            "results": [{"statusCode": 200, "result": describe}]
+        }
+        mock_modules["loader"].return_value = {
+            "fields": {"read": ["Name"], "edit": []},
+            "restricted_fields": ["OwnerId"],
         }
-        mock_connection.PermissionSet.create.return_value = {"success": True, "id": "123"}
 
-        config = {"fields": {"read": ["Name"], "edit": ["Status"]}}
+        import src.main
+        from src.main import process_objects
 
-        mock_modules["loader"].return_value = config
-        with patch("sys.argv", ["main.py", "--custom-all"]):
-            from src.main import main
+        monkeypatch.setattr(src.main.logger, "isEnabledFor", lambda level: True)
+        process_objects(mock_connection, ["Account"], verbose=True)
+        mock_connection.restful.assert_any_call("composite/batch", method="POST", json=ANY)
+        mock_connection.describe.assert_not_called()
+        mock_connection.Account.describe.assert_not_called()
+
+    def test_process_objects_verbose_above_info(self, mock_modules, in_config_dir, monkeypatch):
+        mock_connection = MagicMock()
+        mock_modules["loader"].return_value = {"fields": {"read": ["Name"], "edit": []}}
+
+        import src.main
+        from src.main import process_objects
 
-            main()
-            mock_connection.describe.assert_called()
+        monkeypatch.setattr(src.main.logger, "isEnabledFor", lambda level: level > logging.INFO)
+        process_objects(mock_connection, ["Account"], verbose=True)
+        paths = [call.args[0] for call in mock_connection.restful.call_args_list]
+        assert "composite/batch" not in paths
+        mock_connection.Account.describe.assert_not_called()
 
-    def test_main_specific_objects(self, mock_modules):
+    def test_process_objects_config_error(self, mock_modules, in_config_dir):
         mock_connection = mock_modules["sfdc_manager"].connect.return_value.__enter__.return_value
-        mock_connection.PermissionSet.create.return_value = {"success": True, "id": "123"}
+        objects = ["Account", "Invalid"]
 
-        config = {"fields": {"read": ["Name"], "edit": ["Status"]}}
+        mock_modules["loader"].side_effect = FileNotFoundError
+        from src.main import process_objects
 
-        mock_modules["loader"].return_value = config
-        with patch("sys.argv", ["main.py", "--objects", "Account", "Contact"]):
-            from src.main import main
+        process_objects(mock_connection, objects)
+        mock_modules["sfdc_manager"].set_field_permissions.assert_not_called()
+
+    def test_process_objects_skips_missing_configs(self, mock_modules, tmp_path, monkeypatch):
+        (tmp_path / "config").mkdir()
+        (tmp_path / "config" / "Account.yaml").write_text("fields: {}\n")
+        monkeypatch.chdir(tmp_path)
+        mock_connection = MagicMock()
+        mock_modules["loader"].return_value = {"fields": {"read": ["Name"], "edit": []}}
+
+        from src.main import process_objects
+
+        process_objects(mock_connection, ["Account", "Missing__c"])
+        queries = " ".join(call.args[0] for call in mock_connection.query_all.call_args_list)
+        assert "Account_read_Permissions" in queries and "Missing__c" not in queries
+        mock_modules["sfdc_manager"].create_permission_sets.assert_called_once_with(
+            [
+                {"Name": "Account_read_Permissions", "Label": "Account Read Permissions"},
+                {"Name": "Account_edit_Permissions", "Label": "Account Edit Permissions"},
+            ]
+        )
 
-            main()
-            mock_connection.PermissionSet.create.assert_called()
+    def test_process_objects_without_configs(self, mock_modules, tmp_path, monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        mock_connection = MagicMock()
 
-    def test_main_no_objects(self, mock_modules):
-        with patch("sys.argv", ["main.py"]):
-            from src.main import main
+        from src.main import process_objects
 
-            with pytest.raises(SystemExit):
-                main()
-            mock_modules["sfdc_manager"].describe.assert_not_called()
+        process_objects(mock_connection, ["Account"])
+        mock_connection.query_all.assert_not_called()
+        mock_modules["sfdc_manager"].create_permission_sets.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "args, called",
+        [
+            (["--all"], "describe"),
+            (["--custom-all"], "describe"),
+        ],
+    )
+    def test_main(self, mock_modules, in_config_dir, run_main, args, called):
+        mock_connection = mock_modules["sfdc_manager"].connect.return_value.__enter__.return_value
+        mock_connection.describe.return_value = {
+            "sobjects": [
+                {"name": "Account", "custom": False},
+                {"name": "Custom__c", "custom": True},
+            ]
+        }
+        mock_modules["loader"].return_value = {"fields": {"read": ["Name"], "edit": ["Status"]}}
+
+        run_main(*args)
+        attrgetter(called)(mock_connection).assert_called()
+
+    def test_main_objects(self, mock_modules, in_config_dir, run_main):
+        mock_modules["loader"].return_value = {"fields": {"read": ["Name"], "edit": ["Status"]}}
+
+        run_main("--objects", "Account", "Contact")
+        # Contact has no configuration file in the test directory
+        (permission_sets,) = mock_modules["sfdc_manager"].create_permission_sets.call_args.args
+        assert [permission_set["Name"] for permission_set in permission_sets] == [
+            "Account_read_Permissions",
+            "Account_edit_Permissions",
+        ]
+        mock_modules["sfdc_manager"].set_field_permissions.assert_called()
+
+    def test_main_exits_on_failed_objects(self, mock_modules, run_main):
+        with patch("src.main.process_objects", side_effect=Exception("Failed to process")):
+            with pytest.raises(SystemExit) as exc_info:
+                run_main("--objects", "Account")
+        assert exc_info.value.code == 1
+
+    def test_main_deduplicates_objects(self, mock_modules, run_main):
+        with patch("src.main.process_objects") as mock_process:
+            run_main("--objects", "Account", "Contact", "Account")
+        assert mock_process.call_args[0][1] == ["Account", "Contact"]
+
+    def test_build_parser_cached(self, mock_modules):
+        from src.main import _build_parser
+
+        assert _build_parser() is _build_parser()
+
+    def test_main_no_objects(self, mock_modules, run_main):
+        with pytest.raises(SystemExit):
+            run_main()
+        mock_modules["sfdc_manager"].describe.assert_not_called()
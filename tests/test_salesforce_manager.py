@@ -1,9 +1,13 @@
-import os
-from unittest.mock import MagicMock, patch
+import threading
+import time
+from unittest.mock import ANY, MagicMock, patch
 
 import pytest
+import requests
+import urllib3
+from simple_salesforce.exceptions import SalesforceError, SalesforceExpiredSession
 
-from src.salesforce_manager import SalesforceManager
+from src.salesforce_manager import RetryableSalesforceError, SalesforceManager
 
 
 class TestSalesforceManager:
@@ -12,15 +16,16 @@ class TestSalesforceManager:
         return SalesforceManager()
 
     @pytest.fixture
-    def mock_env(self):
+    def mock_env(self, monkeypatch):
         env = {
             "SF_USERNAME": "test@example.com",
             "SF_PASSWORD": "password123",
             "SF_SECURITY_TOKEN": "token123",
             "SF_DOMAIN": "test.salesforce.com",
         }
-        with patch.dict(os.environ, env):
-            yield env
+        for key, value in env.items():
+            monkeypatch.setenv(key, value)
+        return env
 
     def test_create_connection(self, manager, mock_env):
         with patch("src.salesforce_manager.Salesforce") as mock_sf:
@@ -30,27 +35,97 @@ class TestSalesforceManager:
                 password=mock_env["SF_PASSWORD"],
                 security_token=mock_env["SF_SECURITY_TOKEN"],
                 instance=mock_env["SF_DOMAIN"],
+                session=ANY,
             )
             assert connection == mock_sf.return_value
 
-    def test_connect_context_manager(self, manager):
-        mock_connection = MagicMock()
+    def test_create_session(self, manager):
+        session = manager.create_session()
+        adapter = session.get_adapter("https://example.my.salesforce.com")
+        assert adapter._pool_maxsize == 50
+        assert adapter._pool_block is True
+        assert adapter.max_retries.total == 5
+        assert 503 in adapter.max_retries.status_forcelist
+        assert "POST" not in adapter.max_retries.allowed_methods
+
+    def test_create_connection_reuses_settings(self, manager, mock_env, monkeypatch):
+        with patch("src.salesforce_manager.Salesforce") as mock_sf:
+            manager.create_connection()
+            monkeypatch.setenv("SF_USERNAME", "other@example.com")
+            manager.create_connection()
+        assert mock_sf.call_args.kwargs["username"] == mock_env["SF_USERNAME"]
+
+    def test_create_connection_missing_settings(self, manager, mock_env, monkeypatch):
+        monkeypatch.delenv("SF_PASSWORD")
+        monkeypatch.setenv("SF_SECURITY_TOKEN", "")
+        with patch("src.salesforce_manager.Salesforce") as mock_sf:
+            with pytest.raises(
+                ValueError, match=r"^Missing Salesforce settings: SF_PASSWORD, SF_SECURITY_TOKEN$"
+            ):
+                manager.create_connection()
+        mock_sf.assert_not_called()
+
+    def test_create_connection_orjson(self, manager, mock_env):
+        response = MagicMock(content=b'{"sobjects": []}')
+        with patch("src.salesforce_manager.Salesforce"), patch(
+            "src.salesforce_manager.orjson"
+        ) as mock_orjson:
+            connection = manager.create_connection()
+            connection.parse_result_to_json(response)
+            mock_orjson.loads.assert_called_once_with(b'{"sobjects": []}')
+
+    def test_create_connection_without_orjson(self, manager, mock_env):
+        with patch("src.salesforce_manager.Salesforce") as mock_sf, patch(
+            "src.salesforce_manager.orjson", None
+        ):
+            connection = manager.create_connection()
+            assert connection.parse_result_to_json is mock_sf.return_value.parse_result_to_json
+
+    def test_connect_context_manager(self, manager, sf_connection):
+        mock_connection = sf_connection
         with patch.object(manager, "create_connection", return_value=mock_connection):
             with manager.connect() as conn:
                 assert conn == mock_connection
                 assert manager.connection == mock_connection
-            assert manager.connection is None
+            assert manager.connection == mock_connection
+        manager.close()
+        assert manager.connection is None
+        mock_connection.session.close.assert_called_once()
+
+    def test_connect_reuses_connection(self, manager):
+        with patch.object(manager, "create_connection", side_effect=MagicMock) as mock_create:
+            with manager.connect() as first:
+                pass
+            with manager.connect() as second:
+                assert second is first
+            mock_create.assert_called_once()
+
+            # Past the maximum session age a new login is made
+            with patch(
+                "src.salesforce_manager.time.monotonic", return_value=time.monotonic() + 3601
+            ):
+                with manager.connect() as third:
+                    assert third is not first
+            assert mock_create.call_count == 2
+
+    def test_connect_drops_expired_session(self, manager):
+        with patch.object(manager, "create_connection", return_value=MagicMock()):
+            with pytest.raises(SalesforceExpiredSession):
+                with manager.connect():
+                    raise SalesforceExpiredSession(
+                        "https://example.my.salesforce.com", 401, "query", b"INVALID_SESSION_ID"
+                    )
+        assert manager.connection is None
 
     def test_connect_error_handling(self, manager):
         with patch.object(manager, "create_connection", side_effect=Exception("Connection error")):
-            with pytest.raises(Exception) as exc_info:
+            with pytest.raises(Exception, match=r"^Connection error$"):
                 with manager.connect():
                     pass
-            assert str(exc_info.value) == "Connection error"
             assert manager.connection is None
 
-    def test_get_api_usage(self, manager):
-        mock_connection = MagicMock()
+    def test_get_api_usage(self, manager, sf_connection):
+        mock_connection = sf_connection
         mock_connection.limits.return_value = {
             "DailyApiRequests": {"Remaining": 15000, "Max": 50000}
         }
@@ -61,81 +136,429 @@ class TestSalesforceManager:
         assert max_requests == 50000
         mock_connection.limits.assert_called_once()
 
+    def test_get_api_usage_cached(self, manager, sf_connection):
+        mock_connection = sf_connection
+        mock_connection.limits.return_value = {
+            "DailyApiRequests": {"Remaining": 15000, "Max": 50000}
+        }
+        mock_connection.PermissionSet.create.return_value = {"success": True, "id": "0PS"}
+        manager.connection = mock_connection
+
+        assert manager.get_api_usage() == (15000, 50000)
+        manager.create_permission_set("Account", "basic")
+        assert manager.get_api_usage() == (14999, 50000)
+        mock_connection.limits.assert_called_once()
+
+        with patch("src.salesforce_manager.time.monotonic", return_value=time.monotonic() + 61):
+            assert manager.get_api_usage() == (15000, 50000)
+        assert mock_connection.limits.call_count == 2
+
     def test_get_api_usage_no_connection(self, manager):
-        with pytest.raises(RuntimeError) as exc_info:
+        with pytest.raises(RuntimeError, match=r"^No active Salesforce connection$"):
             manager.get_api_usage()
-        assert str(exc_info.value) == "No active Salesforce connection"
 
-    def test_get_api_usage_error(self, manager):
-        mock_connection = MagicMock()
+    def test_get_api_usage_error(self, manager, sf_connection):
+        mock_connection = sf_connection
         mock_connection.limits.side_effect = Exception("API error")
         manager.connection = mock_connection
 
-        with pytest.raises(Exception) as exc_info:
+        with pytest.raises(Exception, match=r"^Failed to get API usage: API error$"):
+            manager.get_api_usage()
+
+    def test_get_api_usage_unexpected_response(self, manager, sf_connection):
+        manager.connection = sf_connection
+        manager.connection.limits.return_value = {"DailyBulkApiBatches": {}}
+
+        with pytest.raises(RuntimeError, match=r"^Unexpected limits response"):
             manager.get_api_usage()
-        assert str(exc_info.value) == "Failed to get API usage: API error"
 
-    def test_create_permission_set_success(self, manager):
-        mock_connection = MagicMock()
+    def test_create_permission_set_success(self, manager, sf_connection):
+        mock_connection = sf_connection
         mock_connection.PermissionSet.create.return_value = {"success": True, "id": "0PS1234567890"}
         manager.connection = mock_connection
 
         result = manager.create_permission_set("Account", "basic")
         assert result == "0PS1234567890"
-        mock_connection.PermissionSet.create.assert_called_once()
+        mock_connection.PermissionSet.create.assert_called_once_with(
+            {
+                "Name": "Account_basic_Permissions",
+                "Label": "Account basic Permissions",
+                "Description": "Permission set for Account with record type basic",
+            }
+        )
 
     def test_create_permission_set_no_connection(self, manager):
-        with pytest.raises(RuntimeError) as exc_info:
+        with pytest.raises(RuntimeError, match=r"^No active Salesforce connection$"):
             manager.create_permission_set("Account", "basic")
-        assert str(exc_info.value) == "No active Salesforce connection"
 
-    def test_create_permission_set_failure(self, manager):
-        mock_connection = MagicMock()
+    def test_create_permission_set_failure(self, manager, sf_connection):
+        mock_connection = sf_connection
         mock_connection.PermissionSet.create.return_value = {
             "success": False,
             "errors": ["Permission set already exists"],
         }
         manager.connection = mock_connection
 
-        with pytest.raises(Exception) as exc_info:
+        with pytest.raises(Exception, match=r"Failed to create permission set"):
             manager.create_permission_set("Account", "basic")
-        assert "Failed to create permission set" in str(exc_info.value)
 
-    def test_set_field_permissions_success(self, manager):
-        mock_connection = MagicMock()
-        mock_connection.FieldPermissions.create.return_value = {"success": True}
+    def test_create_permission_sets(self, manager, sf_connection):
+        mock_connection = sf_connection
+        mock_connection.restful.side_effect = lambda *args, **kwargs: [
+            {"success": True, "id": f"0PS{record['Name']}"} for record in kwargs["json"]["records"]
+        ]
+        manager.connection = mock_connection
+
+        names = [f"Object{i}_read_Permissions" for i in range(250)]
+        created = manager.create_permission_sets([{"Name": name, "Label": name} for name in names])
+
+        assert created == {name: f"0PS{name}" for name in names}
+        batches = [
+            call.kwargs["json"]["records"] for call in mock_connection.restful.call_args_list
+        ]
+        assert [len(batch) for batch in batches] == [200, 50]
+        assert batches[0][0] == {
+            "attributes": {"type": "PermissionSet"},
+            "Name": "Object0_read_Permissions",
+            "Label": "Object0_read_Permissions",
+        }
+        mock_connection.PermissionSet.create.assert_not_called()
+
+    def test_create_permission_sets_failure(self, manager, sf_connection):
+        mock_connection = sf_connection
+        mock_connection.restful.return_value = [
+            {"success": True, "id": "0PS1"},
+            {"success": False, "errors": ["DUPLICATE_DEVELOPER_NAME"]},
+        ]
+        manager.connection = mock_connection
+
+        created = manager.create_permission_sets(
+            [{"Name": "Account_read_Permissions"}, {"Name": "Account_edit_Permissions"}]
+        )
+        assert created == {"Account_read_Permissions": "0PS1"}
+
+    def test_set_field_permissions_success(self, manager, sf_connection):
+        mock_connection = sf_connection
+        mock_connection.restful.return_value = [{"success": True}, {"success": True}]
         manager.connection = mock_connection
 
         fields = ["Name", "Description"]
         manager.set_field_permissions("PS_ID", "Account", fields, "read")
 
-        assert mock_connection.FieldPermissions.create.call_count == len(fields)
+        mock_connection.restful.assert_called_once()
+        records = mock_connection.restful.call_args.kwargs["json"]["records"]
+        assert [record["Field"] for record in records] == ["Account.Name", "Account.Description"]
+        assert all(record["PermissionsRead"] for record in records)
+        assert not any(record["PermissionsEdit"] for record in records)
+        assert all(record["SobjectType"] == "Account" for record in records)
+        mock_connection.FieldPermissions.create.assert_not_called()
+
+    def test_set_field_permissions_new_permission_set(self, manager, sf_connection):
+        sf_connection.restful.return_value = [{"success": True}]
+        manager.connection = sf_connection
+
+        manager.set_field_permissions("PS_ID", "Account", ["Name"], "read", check_existing=False)
+
+        sf_connection.query_all.assert_not_called()
+        sf_connection.restful.assert_called_once()
+
+    def test_set_field_permissions_skips_granted(self, manager, sf_connection):
+        mock_connection = sf_connection
+        mock_connection.query_all.return_value = {
+            "records": [
+                {
+                    "Id": "0PF1",
+                    "Field": "Account.Name",
+                    "PermissionsRead": True,
+                    "PermissionsEdit": False,
+                },
+            ]
+        }
+        mock_connection.restful.return_value = [{"success": True}]
+        manager.connection = mock_connection
+
+        manager.set_field_permissions("0PS1", "Account", ["Name", "Phone"], "read")
+
+        mock_connection.query_all.assert_called_once_with(
+            "SELECT Id, Field, PermissionsRead, PermissionsEdit FROM FieldPermissions "
+            "WHERE ParentId = '0PS1' AND SobjectType = 'Account'"
+        )
+        mock_connection.restful.assert_called_once()
+        records = mock_connection.restful.call_args.kwargs["json"]["records"]
+        assert [record["Field"] for record in records] == ["Account.Phone"]
+
+    def test_set_field_permissions_updates_other_access(self, manager, sf_connection):
+        mock_connection = sf_connection
+        mock_connection.query_all.return_value = {
+            "records": [
+                {
+                    "Id": "0PF1",
+                    "Field": "Account.Phone",
+                    "PermissionsRead": True,
+                    "PermissionsEdit": True,
+                },
+            ]
+        }
+        mock_connection.restful.return_value = [{"success": True}]
+        manager.connection = mock_connection
+
+        manager.set_field_permissions("0PS1", "Account", ["Phone"], "read")
+
+        mock_connection.restful.assert_called_once_with(
+            "composite/sobjects",
+            method="PATCH",
+            json={
+                "allOrNone": False,
+                "records": [
+                    {
+                        "attributes": {"type": "FieldPermissions"},
+                        "Id": "0PF1",
+                        "PermissionsRead": True,
+                        "PermissionsEdit": False,
+                    }
+                ],
+            },
+        )
+
+    def test_set_field_permissions_no_fields(self, manager, sf_connection):
+        manager.connection = sf_connection
+
+        manager.set_field_permissions("0PS1", "Account", [], "read")
+        sf_connection.query_all.assert_not_called()
+        sf_connection.restful.assert_not_called()
+
+    def test_set_field_permissions_all_granted(self, manager, sf_connection):
+        mock_connection = sf_connection
+        mock_connection.query_all.return_value = {
+            "records": [
+                {
+                    "Id": "0PF1",
+                    "Field": "Account.Name",
+                    "PermissionsRead": True,
+                    "PermissionsEdit": True,
+                }
+            ]
+        }
+        manager.connection = mock_connection
+
+        manager.set_field_permissions("0PS1", "Account", ["Name"], "edit")
+        mock_connection.restful.assert_not_called()
+
+    def test_set_field_permissions_chunks(self, manager, sf_connection):
+        mock_connection = sf_connection
+        mock_connection.restful.side_effect = lambda *args, **kwargs: [
+            {"success": True} for _ in kwargs["json"]["records"]
+        ]
+        manager.connection = mock_connection
+
+        fields = [f"Field{i}__c" for i in range(450)]
+        manager.set_field_permissions("PS_ID", "Account", fields, "edit")
+
+        chunks = [call.kwargs["json"]["records"] for call in mock_connection.restful.call_args_list]
+        assert sorted(len(chunk) for chunk in chunks) == [50, 200, 200]
+        fields_sent = sorted(record["Field"] for chunk in chunks for record in chunk)
+        assert fields_sent == sorted(f"Account.{field}" for field in fields)
+        assert all(record["PermissionsEdit"] for chunk in chunks for record in chunk)
+
+    def test_set_field_permissions_bulk(self, manager, monkeypatch, sf_connection):
+        monkeypatch.setenv("PRAVATOR_BULK_THRESHOLD", "3")
+        mock_connection = sf_connection
+        bulk = mock_connection.bulk2.FieldPermissions
+        bulk.insert.return_value = [{"numberRecordsFailed": 0, "job_id": "750A"}]
+        manager.connection = mock_connection
+
+        manager.set_field_permissions("PS_ID", "Account", ["Name", "Phone", "Rating"], "edit")
+
+        mock_connection.restful.assert_not_called()
+        records = bulk.insert.call_args.kwargs["records"]
+        assert records[0] == {
+            "PermissionsRead": "true",
+            "PermissionsEdit": "true",
+            "ParentId": "PS_ID",
+            "SobjectType": "Account",
+            "Field": "Account.Name",
+        }
+        assert len(records) == 3
+        bulk.get_failed_records.assert_not_called()
+
+    def test_set_field_permissions_bulk_failure(self, manager, monkeypatch, sf_connection):
+        monkeypatch.setenv("PRAVATOR_BULK_THRESHOLD", "1")
+        mock_connection = sf_connection
+        bulk = mock_connection.bulk2.FieldPermissions
+        bulk.insert.return_value = [{"numberRecordsFailed": 1, "job_id": "750A"}]
+        bulk.get_failed_records.return_value = (
+            '"sf__Id","sf__Error",Field,ParentId\n'
+            '"","INVALID_OR_NULL_FOR_RESTRICTED_PICKLIST:Field",Account.Bad,PS_ID\n'
+        )
+        manager.connection = mock_connection
+
+        with pytest.raises(Exception) as exc_info:
+            manager.set_field_permissions("PS_ID", "Account", ["Bad"], "read")
+        assert str(exc_info.value) == (
+            "Failed to set permissions for 1 fields: "
+            "Bad: INVALID_OR_NULL_FOR_RESTRICTED_PICKLIST:Field"
+        )
+        bulk.get_failed_records.assert_called_once_with("750A")
+
+    def test_set_field_permissions_invalid_bulk_threshold(
+        self, manager, monkeypatch, sf_connection
+    ):
+        monkeypatch.setenv("PRAVATOR_BULK_THRESHOLD", "2k")
+        manager.connection = sf_connection
+
+        with pytest.raises(ValueError, match="PRAVATOR_BULK_THRESHOLD must be an integer"):
+            manager.set_field_permissions("PS_ID", "Account", ["Name"])
+        sf_connection.restful.assert_not_called()
 
     def test_set_field_permissions_no_connection(self, manager):
-        with pytest.raises(RuntimeError) as exc_info:
+        with pytest.raises(RuntimeError, match=r"^No active Salesforce connection$"):
             manager.set_field_permissions("PS_ID", "Account", ["Name"], "read")
-        assert str(exc_info.value) == "No active Salesforce connection"
 
-    def test_set_field_permissions_invalid_access_level(self, manager):
-        manager.connection = MagicMock()
-        with pytest.raises(ValueError) as exc_info:
+    def test_set_field_permissions_invalid_access_level(self, manager, sf_connection):
+        manager.connection = sf_connection
+        with pytest.raises(ValueError, match=r"^access_level must be either 'read' or 'edit'$"):
             manager.set_field_permissions("PS_ID", "Account", ["Name"], "invalid")
-        assert str(exc_info.value) == "access_level must be either 'read' or 'edit'"
 
-    def test_set_field_permissions_failure(self, manager):
-        mock_connection = MagicMock()
-        mock_connection.FieldPermissions.create.return_value = {
-            "success": False,
-            "errors": ["Invalid field"],
-        }
+    def test_set_field_permissions_failure(self, manager, sf_connection):
+        mock_connection = sf_connection
+        mock_connection.restful.return_value = [{"success": False, "errors": ["Invalid field"]}]
         manager.connection = mock_connection
 
-        with pytest.raises(Exception) as exc_info:
+        with pytest.raises(Exception, match=r"Failed to set permissions for 1 fields"):
             manager.set_field_permissions("PS_ID", "Account", ["InvalidField"], "read")
-        assert "Failed to set permissions for field" in str(exc_info.value)
 
-    def test_create_edit_permission_set(self, manager):
-        mock_connection = MagicMock()
+    def test_set_field_permissions_reports_all_failures(self, manager, sf_connection):
+        mock_connection = sf_connection
+        mock_connection.restful.return_value = [
+            {"success": False, "errors": ["Invalid field"]},
+            {"success": True},
+            {"success": False, "errors": ["Field is not permissionable"]},
+        ]
+        manager.connection = mock_connection
+
+        with pytest.raises(Exception) as exc_info:
+            manager.set_field_permissions("PS_ID", "Account", ["Bad", "Name", "Id"], "read")
+        assert str(exc_info.value) == (
+            "Failed to set permissions for 2 fields: "
+            "Bad: ['Invalid field']; Id: ['Field is not permissionable']"
+        )
+
+    def test_field_permission_requests_limited(self, monkeypatch, sf_connection):
+        monkeypatch.setenv("PRAVATOR_MAX_CONCURRENT_REQUESTS", "2")
+        manager = SalesforceManager()
+        in_flight, peak = 0, 0
+        lock = threading.Lock()
+
+        def restful(*args, **kwargs):
+            nonlocal in_flight, peak
+            with lock:
+                in_flight += 1
+                peak = max(peak, in_flight)
+            # time.sleep is mocked for every test, hold the slot with a real wait
+            threading.Event().wait(0.02)
+            with lock:
+                in_flight -= 1
+            return [{"success": True} for _ in kwargs["json"]["records"]]
+
+        manager.connection = sf_connection
+        manager.connection.restful.side_effect = restful
+        manager.set_field_permissions("PS_ID", "Account", [f"F{i}__c" for i in range(1000)])
+
+        assert manager.connection.restful.call_count == 5
+        assert peak == 2
+
+    def test_max_concurrent_requests_at_least_one(self, monkeypatch):
+        monkeypatch.setenv("PRAVATOR_MAX_CONCURRENT_REQUESTS", "0")
+        limiter = SalesforceManager()._get_limiters()["FieldPermissions"]
+
+        assert limiter.acquire(blocking=False)
+        assert not limiter.acquire(blocking=False)
+
+    def test_max_concurrent_requests_invalid(self, monkeypatch):
+        monkeypatch.setenv("PRAVATOR_MAX_CONCURRENT_REQUESTS", "five")
+        # Creating the manager, as importing the module does, must not fail
+        manager = SalesforceManager()
+
+        with patch.object(manager, "create_connection") as create_connection:
+            with pytest.raises(
+                ValueError, match="PRAVATOR_MAX_CONCURRENT_REQUESTS must be an integer"
+            ):
+                with manager.connect():
+                    pass
+        create_connection.assert_not_called()
+
+    def test_create_permission_set_unavailable(self, manager, sf_connection, mock_sleep):
+        manager.connection = sf_connection
+        manager.connection.PermissionSet.create.side_effect = SalesforceError(
+            "https://example.my.salesforce.com", 503, "PermissionSet", b"Server Unavailable"
+        )
+
+        with pytest.raises(RetryableSalesforceError):
+            manager.create_permission_set("Account", "basic")
+        assert manager.connection.PermissionSet.create.call_count == 5
+        assert mock_sleep.call_count == 4
+
+    def test_create_permission_set_retries_refused_connection(
+        self, manager, sf_connection, mock_sleep
+    ):
+        refused = urllib3.exceptions.MaxRetryError(
+            None, "/", urllib3.exceptions.NewConnectionError(None, "Connection refused")
+        )
+        manager.connection = sf_connection
+        manager.connection.PermissionSet.create.side_effect = [
+            requests.exceptions.ConnectionError(refused),
+            {"success": True, "id": "0PS1234567890"},
+        ]
+
+        result = manager.create_permission_set("Account", "basic")
+        assert result == "0PS1234567890"
+        mock_sleep.assert_called_once()
+
+    def test_create_permission_set_does_not_resend_dropped_connection(
+        self, manager, sf_connection, mock_sleep
+    ):
+        manager.connection = sf_connection
+        manager.connection.PermissionSet.create.side_effect = requests.exceptions.ConnectionError(
+            "Remote end closed connection without response"
+        )
+
+        with pytest.raises(requests.exceptions.ConnectionError):
+            manager.create_permission_set("Account", "basic")
+        manager.connection.PermissionSet.create.assert_called_once()
+        mock_sleep.assert_not_called()
+
+    def test_create_permission_sets_retries_unavailable(self, manager, sf_connection, mock_sleep):
+        manager.connection = sf_connection
+        sf_connection.restful.side_effect = [
+            SalesforceError(
+                "https://example.my.salesforce.com", 503, "composite/sobjects", b"Unavailable"
+            ),
+            [{"success": True, "id": "0PS1"}],
+        ]
+
+        created = manager.create_permission_sets([{"Name": "Account_read_Permissions"}])
+        assert created == {"Account_read_Permissions": "0PS1"}
+        assert sf_connection.restful.call_count == 2
+        mock_sleep.assert_called_once()
+
+    def test_set_field_permissions_retries_refused_connection(
+        self, manager, sf_connection, mock_sleep
+    ):
+        refused = urllib3.exceptions.MaxRetryError(
+            None, "/", urllib3.exceptions.NewConnectionError(None, "Connection refused")
+        )
+        manager.connection = sf_connection
+        sf_connection.restful.side_effect = [
+            requests.exceptions.ConnectionError(refused),
+            [{"success": True}],
+        ]
+
+        manager.set_field_permissions("PS_ID", "Account", ["Name"], "read", check_existing=False)
+        assert sf_connection.restful.call_count == 2
+        mock_sleep.assert_called_once()
+
+    def test_create_edit_permission_set(self, manager, sf_connection):
+        mock_connection = sf_connection
         mock_connection.PermissionSet.create.return_value = {"success": True, "id": "0PS1234567890"}
         manager.connection = mock_connection
 